@@ -0,0 +1,254 @@
+"""HTTP JSON API over core.py, as a plain ASGI application.
+
+    uvicorn api:app --host 0.0.0.0 --port 8000 --workers 4
+
+Endpoints:
+
+    GET  /health
+    POST /assess             {"water_gallons", "electricity_kwh", "gas_cubic_m", "household"?, "save"?}
+    GET  /materials/<name>   analysis and tips, plus spelling suggestions
+    POST /materials          {"names": [...]} analysis and tips for up to MAX_BATCH_MATERIALS
+    GET  /history            ?household=&start=&end=&limit=&cursor=&order=newest|oldest
+    GET  /metrics            latency histograms and counters in the Prometheus text format
+
+``start`` and ``end`` are ISO 8601 datetimes (end exclusive); ``cursor`` is the
+``next_cursor`` of the previous page. Store and model calls run in worker
+threads, so one slow request does not hold up the event loop. The API shares
+the database and model snapshot configuration with the Streamlit app, so both
+can run side by side and be scaled separately: before each request a worker
+passes what other processes committed since to its rollups, model and caches
+(database.sync).
+"""
+import asyncio
+import datetime
+import json
+import math
+import time
+from urllib.parse import parse_qs
+
+import numpy as np
+
+import core
+import database as db
+import metrics
+
+MAX_BODY_BYTES = 64 * 1024
+MAX_PAGE_SIZE = 1000
+MAX_BATCH_MATERIALS = 100
+USAGE_FIELDS = ("water_gallons", "electricity_kwh", "gas_cubic_m")
+PROMETHEUS_CONTENT_TYPE = b"text/plain; version=0.0.4; charset=utf-8"
+
+request_seconds = metrics.histogram("ecoaudit_http_request_seconds", "Time to handle an API request.")
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serialisable")
+
+
+async def _send(send, status, body, content_type):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_json(send, status, payload):
+    await _send(send, status, json.dumps(payload, default=_json_default).encode(), b"application/json")
+
+
+async def _read_json(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise HTTPError(413, "request body too large")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            break
+    try:
+        body = json.loads(b"".join(chunks) or b"{}")
+    except ValueError:
+        raise HTTPError(400, "request body must be JSON")
+    if not isinstance(body, dict):
+        raise HTTPError(400, "request body must be a JSON object")
+    return body
+
+
+def _query(scope):
+    return {key: values[-1] for key, values in parse_qs(scope.get("query_string", b"").decode()).items()}
+
+
+def _datetime_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        value = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an ISO 8601 datetime")
+    # Stored timestamps are naive local time
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo else value
+
+
+async def health(scope, receive):
+    return {"status": "ok", "model_version": core.registry.current()[0]}
+
+
+async def assess(scope, receive):
+    body = await _read_json(receive)
+    try:
+        water, electricity, gas = (float(body[field]) for field in USAGE_FIELDS)
+    except KeyError as e:
+        raise HTTPError(400, f"missing {e.args[0]}")
+    except (TypeError, ValueError):
+        raise HTTPError(400, "usage values must be numbers")
+    if not all(math.isfinite(value) and value >= 0 for value in (water, electricity, gas)):
+        raise HTTPError(400, "usage values must be finite and non-negative")
+    household = str(body.get("household") or db.DEFAULT_TENANT)
+
+    def run():
+        # One model version for the whole request, as the app pins one per rerun
+        model_version, eco_ai = core.registry.current()
+        water_status, electricity_status, gas_status, analysis = core.assess_usage_with_ai(
+            water, electricity, gas, household, eco_ai
+        )
+        if body.get("save"):
+            db.save_utility_usage(water, electricity, gas, water_status, electricity_status, gas_status, household)
+        return {"household": household, "model_version": model_version, "saved": bool(body.get("save")), **analysis}
+
+    return await asyncio.to_thread(run)
+
+
+async def material(scope, receive, name):
+    # ASGI servers hand over scope["path"] already percent-decoded
+    name = name.strip()
+    if not name:
+        raise HTTPError(400, "material name is required")
+
+    analysis, suggestions = await asyncio.gather(
+        core.smart_assistant_async(name), asyncio.to_thread(core.suggest_materials, name)
+    )
+    return {"material": name.lower(), **analysis, "suggestions": suggestions}
+
+
+async def material_batch(scope, receive):
+    names = (await _read_json(receive)).get("names")
+    if not isinstance(names, list) or not all(isinstance(name, str) and name.strip() for name in names):
+        raise HTTPError(400, "names must be a list of material names")
+    if len(names) > MAX_BATCH_MATERIALS:
+        raise HTTPError(400, f"at most {MAX_BATCH_MATERIALS} names per request")
+    names = [name.strip() for name in names]
+    results = await core.smart_assistant_batch(names)
+    return {"materials": [{"material": name.lower(), **result} for name, result in zip(names, results)]}
+
+
+async def history(scope, receive):
+    params = _query(scope)
+    try:
+        limit = int(params.get("limit", 50))
+    except ValueError:
+        raise HTTPError(400, "limit must be an integer")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPError(400, f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    order = params.get("order", "newest")
+    if order not in ("newest", "oldest"):
+        raise HTTPError(400, "order must be newest or oldest")
+    household = params.get("household") or db.DEFAULT_TENANT
+    start, end = _datetime_param(params, "start"), _datetime_param(params, "end")
+
+    def run():
+        try:
+            columns, next_cursor = db.query_utility_history(
+                start, end, limit, params.get("cursor"), order == "newest", tenant=household
+            )
+        except ValueError:
+            raise HTTPError(400, "invalid cursor")
+        records = [
+            {name: getattr(record, name) for name in db.UTILITY_COLUMNS}
+            for record in db.columns_to_records(columns)
+        ]
+        return {"household": household, "records": records, "next_cursor": next_cursor}
+
+    return await asyncio.to_thread(run)
+
+
+async def metrics_text(scope, receive):
+    return metrics.render()
+
+
+ROUTES = {
+    ("GET", "/health"): health,
+    ("GET", "/metrics"): metrics_text,
+    ("POST", "/assess"): assess,
+    ("GET", "/history"): history,
+    ("POST", "/materials"): material_batch,
+}
+
+
+def _catch_up():
+    # Servers that skip the lifespan protocol start the registry on the first request
+    core.registry.start()
+    db.sync()
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while (await receive())["type"] != "lifespan.shutdown":
+            await asyncio.to_thread(core.registry.start)
+            await send({"type": "lifespan.startup.complete"})
+        db.store.flush()
+        await send({"type": "lifespan.shutdown.complete"})
+        return
+    if scope["type"] != "http":
+        return
+
+    method, path = scope["method"], scope["path"].rstrip("/") or "/"
+    started = time.perf_counter()
+    await asyncio.to_thread(_catch_up)
+    # Label by route rather than raw path so material names do not become series
+    route, status = "unmatched", 200
+    try:
+        if path.startswith("/materials/"):
+            route = "/materials/{name}"
+            if method != "GET":
+                raise HTTPError(405, "method not allowed")
+            payload = await material(scope, receive, path[len("/materials/"):])
+        else:
+            handler = ROUTES.get((method, path))
+            if handler is None:
+                allowed = any(route_path == path for _, route_path in ROUTES)
+                route = path if allowed else route
+                raise HTTPError(405 if allowed else 404, "method not allowed" if allowed else "not found")
+            route = path
+            payload = await handler(scope, receive)
+    except HTTPError as e:
+        status, payload = e.status, {"error": str(e)}
+    except Exception:
+        status = 500
+        raise
+    finally:
+        request_seconds.labels(route=route, status=status).observe(time.perf_counter() - started)
+    if isinstance(payload, str):
+        await _send(send, status, payload.encode(), PROMETHEUS_CONTENT_TYPE)
+    else:
+        await _send_json(send, status, payload)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,15 +1,21 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import os
 import json
+import time
+import uuid
 from urllib.parse import quote
-from datetime import datetime
+from datetime import datetime, timedelta
 import database as db
-from simple_ai_models import eco_ai, material_ai
+import metrics
+from cache import smart_assistant_cache
+from core import assess_usage_with_ai, help_center, smart_assistant, suggest_materials
+from model_registry import registry
+from rollups import usage_rollups, choose_granularity
 import numpy as np
 
+# Whole-script timing for this rerun, recorded per page at the bottom
+rerun_started = time.perf_counter()
+
 # Set page configuration
 st.set_page_config(
     page_title="EcoAudit",
@@ -33,43 +39,41 @@ if 'show_saved' not in st.session_state:
     st.session_state.show_saved = False
 if 'saved_message' not in st.session_state:
     st.session_state.saved_message = ""
-if 'ai_initialized' not in st.session_state:
-    st.session_state.ai_initialized = False
 
-# Initialize AI system on first run
-if not st.session_state.ai_initialized:
-    with st.spinner("Initializing AI system..."):
-        # Load historical data for AI training
-        historical_data = db.get_utility_history(limit=100)
-        data_for_training = []
-        for record in historical_data:
-            data_for_training.append({
-                'timestamp': record.timestamp,
-                'water_gallons': record.water_gallons,
-                'electricity_kwh': record.electricity_kwh,
-                'gas_cubic_m': record.gas_cubic_m,
-                'water_status': record.water_status,
-                'electricity_status': record.electricity_status,
-                'gas_status': record.gas_status
-            })
-        
-        # Train AI models
-        success, message = eco_ai.train_models(data_for_training)
-        if success:
-            st.session_state.ai_initialized = True
+# Load or train the model on the first rerun, then catch up on what the API
+# or other app processes saved to the same database
+registry.start()
+db.sync()
 
-# Title and introduction with custom icon
-from PIL import Image
-import base64
+# The model is trained once per process by the registry; pin one version for this rerun
+model_version, eco_ai = registry.current()
+material_ai = registry.material_model
 
-# Load the custom icon
-icon = Image.open("generated-icon.png")
+# Each household only sees its own utility data. A new visitor gets a fresh household ID,
+# kept in the URL so a reload or bookmark returns to the same history.
+if 'household' not in st.session_state:
+    st.session_state.household = st.query_params.get("household") or uuid.uuid4().hex[:8]
+household = st.session_state.household.strip() or db.DEFAULT_TENANT
+st.query_params["household"] = household
+
+# Title and introduction with custom icon
+@st.cache_resource
+def load_icon(width):
+    """The icon as PNG bytes already scaled to ``width``, so st.image can serve it without re-encoding."""
+    import io
+    from PIL import Image
+
+    with Image.open("generated-icon.png") as image:
+        height = round(image.height * width / image.width)
+        buffer = io.BytesIO()
+        image.resize((width, height), Image.BILINEAR).save(buffer, format="PNG")
+    return buffer.getvalue()
 
 # Create a column layout for the title with icon
 title_col1, title_col2 = st.columns([1, 5])
 
 with title_col1:
-    st.image(icon, width=100)
+    st.image(load_icon(100), width=100)
     
 with title_col2:
     st.title("EcoAudit")
@@ -83,443 +87,6 @@ with title_col2:
     
 
 
-# AI-Enhanced Functions
-def assess_usage_with_ai(water_gallons, electricity_kwh, gas_cubic_m):
-    """AI-powered utility usage assessment"""
-    # Get historical data for personalized assessment
-    historical_data = db.get_utility_history(limit=50)
-    data_for_analysis = []
-    for record in historical_data:
-        data_for_analysis.append({
-            'timestamp': record.timestamp,
-            'water_gallons': record.water_gallons,
-            'electricity_kwh': record.electricity_kwh,
-            'gas_cubic_m': record.gas_cubic_m
-        })
-    
-    # Use AI-enhanced assessment
-    water_status, electricity_status, gas_status = eco_ai.assess_usage(
-        water_gallons, electricity_kwh, gas_cubic_m, data_for_analysis
-    )
-    
-    # Get AI predictions and analysis
-    current_data = {
-        'timestamp': datetime.now(),
-        'water_gallons': water_gallons,
-        'electricity_kwh': electricity_kwh,
-        'gas_cubic_m': gas_cubic_m
-    }
-    
-    ai_predictions = None
-    ai_recommendations = []
-    efficiency_score = 50
-    
-    if eco_ai.is_trained:
-        try:
-            ai_predictions = eco_ai.predict_usage(current_data)
-            ai_recommendations = eco_ai.generate_recommendations(water_gallons, electricity_kwh, gas_cubic_m)
-            patterns = eco_ai.analyze_usage_patterns(data_for_analysis)
-            efficiency_score = patterns.get('efficiency_score', 50)
-        except:
-            pass
-    
-    ai_analysis = {
-        'status': {
-            'water': water_status,
-            'electricity': electricity_status,
-            'gas': gas_status
-        },
-        'predictions': ai_predictions,
-        'recommendations': ai_recommendations,
-        'efficiency_score': efficiency_score
-    }
-    
-    return water_status, electricity_status, gas_status, ai_analysis
-
-def assess_usage(water_gallons, electricity_kwh, gas_cubic_m):
-    """Compatibility function for existing code"""
-    water_status, electricity_status, gas_status, _ = assess_usage_with_ai(water_gallons, electricity_kwh, gas_cubic_m)
-    return water_status, electricity_status, gas_status
-
-def help_center():
-    help_content = [
-        "**Water Usage:** Normal range is 3000–12000 gallons per month. If it's below 3000, check for a leak.",
-        "**Electricity Usage:** Normal range is 300–800 kWh per month. If it's above 800, please get it checked by an electrician or there might be a fuse or a fire in a while.",
-        "**Gas Usage:** Normal range is 50–150 cubic meters per month. Below 50 may indicate a gas leak."
-    ]
-    return help_content
-
-def smart_assistant(material):
-    """
-    AI-powered material analysis providing reuse and recycle tips for non-biodegradable materials.
-    Uses machine learning to analyze sustainability metrics and generate personalized recommendations.
-    """
-    material = material.lower()
-    
-    # Get AI-powered material analysis
-    ai_analysis = material_ai.analyze_material(material)
-    
-    # Get traditional database recommendations
-    material_data = db.find_material(material)
-    
-    # Combine AI analysis with database information
-    result = {
-        'ai_sustainability_score': ai_analysis['sustainability_score'],
-        'environmental_impact': ai_analysis['environmental_impact'],
-        'recyclability_score': ai_analysis['recyclability'],
-        'material_category': ai_analysis['category'],
-        'reuse_tips': material_data.reuse_tip if material_data else None,
-        'recycle_tips': material_data.recycle_tip if material_data else None
-    }
-    
-    # If no database entry exists, use comprehensive database
-    if not result['reuse_tips'] or not result['recycle_tips']:
-        fallback_data = get_fallback_material_data(material)
-        if fallback_data and isinstance(fallback_data, dict):
-            result['reuse_tips'] = fallback_data.get('reuse', f"Consider creative repurposing of {material} based on its material properties and durability.")
-            result['recycle_tips'] = fallback_data.get('recycle', f"Research local recycling options for {material} or contact waste management services for proper disposal guidance.")
-        else:
-            # Provide generic but useful tips
-            result['reuse_tips'] = f"Consider creative repurposing of {material} based on its material properties and durability."
-            result['recycle_tips'] = f"Research local recycling options for {material} or contact waste management services for proper disposal guidance."
-    
-    return result
-
-def get_fallback_material_data(material):
-    """Get fallback material data from comprehensive database"""
-    # Comprehensive materials database with reuse and recycle tips
-    materials_database = {
-        # Plastics
-        "plastic bag": {
-            "reuse": "Use as trash liners, storage bags, or packing material. Can also be fused together to make waterproof tarps or stronger reusable bags.",
-            "recycle": "Drop at plastic bag collection centers or participating grocery stores. Many retailers have front-of-store recycling bins."
-        },
-        "plastic bottle": {
-            "reuse": "Create bird feeders, planters, watering cans, piggy banks, or desk organizers. Can be cut to make funnels, scoops, or storage containers.",
-            "recycle": "Rinse thoroughly and recycle in curbside recycling if marked with recycling symbols 1 (PET) or 2 (HDPE)."
-        },
-        "plastic container": {
-            "reuse": "Use for food storage, organizing small items, seed starters, or craft projects. Durable containers can become drawer dividers or small tool boxes.",
-            "recycle": "Check the recycling number (1-7) on the bottom and recycle according to local guidelines. Thoroughly clean before recycling."
-        },
-        "plastic cup": {
-            "reuse": "Use for seed starters, craft organization, or small storage. Can be decorated and used as pen holders or small gift containers.",
-            "recycle": "Rinse and recycle #1 or #2 plastic cups. Many clear disposable cups are recyclable."
-        },
-        "plastic straw": {
-            "reuse": "Create craft projects, jewelry, or use for science experiments. Can be used for drainage in potted plants.",
-            "recycle": "Generally not recyclable in most curbside programs due to size. Consider switching to reusable alternatives."
-        },
-        "plastic toy": {
-            "reuse": "Donate to charity, schools, or daycare centers if in good condition. Can be repurposed into art projects.",
-            "recycle": "Hard plastic toys may be recyclable - check with local recycling facilities. Some toy companies have take-back programs."
-        },
-        "plastic lid": {
-            "reuse": "Use as coasters, for arts and crafts, or as paint mixing palettes. Can be used to catch drips under flowerpots.",
-            "recycle": "Many recycling programs accept plastic lids, but they should be separated from bottles/containers."
-        },
-        "plastic cover": {
-            "reuse": "Use as protective surfaces for painting projects, cutting boards for crafts, or drawer liners.",
-            "recycle": "Check recycling number and follow local guidelines. Many rigid plastic covers are recyclable."
-        },
-        "plastic wrap": {
-            "reuse": "Can be cleaned and reused for wrapping items or for art projects. Use as a protective covering for painting.",
-            "recycle": "Most cling wrap/plastic film is not recyclable in curbside programs but can be taken to store drop-off locations."
-        },
-        "polythene": {
-            "reuse": "Use as moisture barriers, protective coverings, or for storage. Heavy-duty sheeting can be used for drop cloths.",
-            "recycle": "Clean, dry polyethylene film can be recycled at store drop-off locations or special film recycling programs."
-        },
-        "bubble wrap": {
-            "reuse": "Reuse for packaging, insulation, or as a plant frost protector. Can be used for textured art projects or stress relief.",
-            "recycle": "Can be recycled with plastic film at grocery store drop-off locations, not in curbside recycling."
-        },
-        "ziploc bag": {
-            "reuse": "Wash and reuse for food storage, organizing small items, or traveling with toiletries. Can be used for marinating foods.",
-            "recycle": "Clean, dry Ziploc bags can be recycled with plastic film at store drop-off locations."
-        },
-        "styrofoam": {
-            "reuse": "Use as packaging material, craft projects, or to make garden seedling trays. Can be broken up and used for drainage in planters.",
-            "recycle": "Difficult to recycle in most areas. Some specialty recycling centers accept clean Styrofoam. Consider reducing usage."
-        },
-        "thermocol": {
-            "reuse": "Can be used for insulation, art projects, or floating devices. Good for organization of fragile items.",
-            "recycle": "Specialized facilities may accept clean thermocol. Contact local waste management for options."
-        },
-        "pvc": {
-            "reuse": "PVC pipes can be repurposed for garden supports, organization systems, or DIY furniture projects.",
-            "recycle": "PVC is difficult to recycle. Check with specialized recycling centers for options."
-        },
-        "acrylic": {
-            "reuse": "Can be cut and reused for picture frames, art displays, or small organization projects.",
-            "recycle": "Usually not accepted in curbside recycling. Some specialty recycling facilities may accept it."
-        },
-        "plastic packaging": {
-            "reuse": "Use for storage, organizing, or craft projects. Blister packaging can become small containers.",
-            "recycle": "Check with local recycling guidelines. Hard plastic packaging may be recyclable; soft film packaging usually needs store drop-off."
-        },
-        
-        # Electronics and E-waste
-        "e-waste": {
-            "reuse": "Consider donating working electronics. Parts can be salvaged for DIY projects or educational purposes.",
-            "recycle": "Take to certified e-waste recycling centers, retail take-back programs, or manufacturer recycling programs."
-        },
-        "battery": {
-            "reuse": "Rechargeable batteries can be recharged hundreds of times. Single-use batteries cannot be reused.",
-            "recycle": "Never throw in trash. Recycle at battery drop-off locations, electronic stores, or hazardous waste facilities."
-        },
-        "phone": {
-            "reuse": "Repurpose as music players, alarm clocks, webcams, or dedicated GPS devices. Donate working phones to charity programs.",
-            "recycle": "Return through manufacturer take-back programs or certified e-waste recyclers who will recover valuable materials."
-        },
-        "laptop": {
-            "reuse": "Older laptops can be repurposed as media centers, digital photo frames, or dedicated writing devices.",
-            "recycle": "Many manufacturers and electronics retailers offer recycling programs. Remove and securely erase data first."
-        },
-        "computer": {
-            "reuse": "Repurpose as a media server, donate to schools or nonprofits, or use parts for other systems.",
-            "recycle": "Take to certified e-waste recyclers, manufacturer take-back programs, or electronics retailers with recycling services."
-        },
-        "tablet": {
-            "reuse": "Repurpose as digital photo frames, kitchen recipe displays, home automation controllers, or security monitors.",
-            "recycle": "Recycle through manufacturer programs, electronics retailers, or certified e-waste recyclers."
-        },
-        "printer": {
-            "reuse": "Donate working printers to schools, nonprofits, or community centers. Parts can be salvaged for projects.",
-            "recycle": "Many electronics retailers and office supply stores offer printer recycling. Never dispose in regular trash."
-        },
-        "wire": {
-            "reuse": "Repurpose for craft projects, garden ties, or organization solutions. Quality cables can be kept as spares.",
-            "recycle": "Recycle with e-waste or at scrap metal facilities. Copper wiring has value for recycling."
-        },
-        "cable": {
-            "reuse": "Label and store useful cables for future use. Can be repurposed for organization or craft projects.",
-            "recycle": "E-waste recycling centers will accept cables and cords. Some retailers also offer cable recycling."
-        },
-        "headphone": {
-            "reuse": "Repair if possible, or use parts for other audio projects. Working headphones can be donated.",
-            "recycle": "Recycle with other e-waste at electronics recycling centers or through manufacturer programs."
-        },
-        "charger": {
-            "reuse": "Keep compatible chargers as backups. Universal chargers can be used for multiple devices.",
-            "recycle": "Recycle with e-waste at electronics recycling centers or through retailer programs."
-        },
-        
-        # Metals
-        "metal": {
-            "reuse": "Metal items can often be repurposed for craft projects, garden art, or functional household items.",
-            "recycle": "Most metals are highly recyclable and valuable. Clean and separate by type when possible."
-        },
-        "aluminum": {
-            "reuse": "Aluminum cans can be used for crafts, planters, or organizational tools. Aluminum foil can be cleaned and reused.",
-            "recycle": "One of the most recyclable materials. Clean and crush cans to save space. Foil should be cleaned first."
-        },
-        "aluminum can": {
-            "reuse": "Create candle holders, pencil cups, wind chimes, or other decorative items. Can be used for camping or craft stoves.",
-            "recycle": "Highly recyclable and can be recycled infinitely. Rinse clean and place in recycling bin."
-        },
-        "aluminum foil": {
-            "reuse": "Clean foil can be reused for cooking, food storage, or crafting. Can be molded into small containers or used as garden pest deterrents.",
-            "recycle": "Clean foil can be recycled. Roll into a ball to prevent it from blowing away in recycling facilities."
-        },
-        "tin can": {
-            "reuse": "Use for storage, planters, candle holders, or craft projects. Can be decorated and repurposed in many ways.",
-            "recycle": "Remove labels, rinse clean, and recycle with metal recycling. The metal is valuable and highly recyclable."
-        },
-        "steel": {
-            "reuse": "Small steel items can be repurposed or used for DIY projects. Steel containers can be reused for storage.",
-            "recycle": "Highly recyclable. Separate from other materials when possible and recycle with metals."
-        },
-        "iron": {
-            "reuse": "Iron pieces can be used for weights, doorstops, or decorative elements. Small pieces can be used in craft projects.",
-            "recycle": "Recyclable at scrap metal facilities. Separate from other metals when possible."
-        },
-        "copper": {
-            "reuse": "Small copper items or wiring can be used for art projects, garden features, or DIY electronics.",
-            "recycle": "Valuable for recycling. Take to scrap metal facilities or e-waste recycling centers."
-        },
-        "brass": {
-            "reuse": "Brass items can be cleaned, polished, and repurposed as decorative elements or functional hardware.",
-            "recycle": "Recyclable at scrap metal facilities. Keep separate from other metals for higher value."
-        },
-        "silver": {
-            "reuse": "Silver items can be cleaned, polished, and reused. Small amounts can be used in craft or jewelry projects.",
-            "recycle": "Valuable for recycling. Take to specialty recyclers or jewelers who may buy silver scrap."
-        },
-        
-        # Glass
-        "glass": {
-            "reuse": "Glass jars and bottles can be washed and reused for storage, craft projects, or serving containers.",
-            "recycle": "Highly recyclable but should be separated by color. Remove lids and rinse clean before recycling."
-        },
-        "glass jar": {
-            "reuse": "Perfect for food storage, organization, vases, candle holders, or terrarium projects.",
-            "recycle": "Remove lids, rinse thoroughly, and recycle. Glass can be recycled endlessly without loss of quality."
-        },
-        "glass bottle": {
-            "reuse": "Reuse as water bottles, vases, lamp bases, garden borders, or decorative items. Can be cut to make drinking glasses.",
-            "recycle": "Remove caps and rinse thoroughly. Sort by color if required by local recycling guidelines."
-        },
-        "light bulb": {
-            "reuse": "Incandescent bulbs can be repurposed as decorative items or craft projects. Do not reuse broken glass.",
-            "recycle": "Incandescent bulbs generally go in trash. CFLs and LEDs should be recycled at specialty locations due to components."
-        },
-        "mirror": {
-            "reuse": "Broken mirrors can be used for mosaic art. Intact mirrors can be reframed or repurposed as decorative items.",
-            "recycle": "Mirror glass is not recyclable with regular glass due to reflective coating. Donate usable mirrors."
-        },
-        "windshield": {
-            "reuse": "Salvaged auto glass can be repurposed for construction, art installations, or landscaping features.",
-            "recycle": "Auto glass is not recyclable in regular glass recycling. Specialized auto recyclers may accept it."
-        },
-        
-        # Rubber and Silicone
-        "rubber": {
-            "reuse": "Can be cut into gaskets, grip pads, or used for craft projects. Rubber strips can function as jar openers.",
-            "recycle": "Specialized rubber recycling programs exist. Check with tire retailers or rubber manufacturers."
-        },
-        "tire": {
-            "reuse": "Create garden planters, swings, outdoor furniture, or playground equipment. Can be used as exercise weights.",
-            "recycle": "Many tire retailers will accept old tires for recycling, usually for a small fee. Never burn tires."
-        },
-        "slipper": {
-            "reuse": "Old flip-flops can be used as kneeling pads, cleaning scrubbers, or craft projects. Donate usable footwear.",
-            "recycle": "Some athletic shoe companies have recycling programs for athletic shoes. Check TerraCycle for specialty programs."
-        },
-        "rubber band": {
-            "reuse": "Keep for organization, sealing containers, or craft projects. Can be used as grip enhancers or hair ties.",
-            "recycle": "Not recyclable in conventional systems. Reuse until worn out, then dispose in trash."
-        },
-        "silicone": {
-            "reuse": "Silicone kitchenware can be repurposed for organizational trays, pet feeding mats, or craft molds.",
-            "recycle": "Not recyclable in conventional systems. Some specialty programs through TerraCycle may exist."
-        },
-        
-        # Paper Products with Non-Biodegradable Elements
-        "tetra pack": {
-            "reuse": "Clean and dry for craft projects, seed starters, or storage containers. Can be used as small compost bins.",
-            "recycle": "Specialized recycling is required due to multiple material layers. Check if your area accepts carton recycling."
-        },
-        "juice box": {
-            "reuse": "Clean thoroughly and use for craft projects, small storage, or seed starters.",
-            "recycle": "Rinse and recycle through carton recycling programs where available."
-        },
-        "laminated paper": {
-            "reuse": "Reuse as durable labels, bookmarks, place mats, or educational materials.",
-            "recycle": "Generally not recyclable due to plastic coating. Reuse instead of recycling."
-        },
-        "waxed paper": {
-            "reuse": "Can be reused several times for food wrapping or as a non-stick surface for crafts.",
-            "recycle": "Not recyclable due to wax coating. Some versions may be compostable if made with natural wax."
-        },
-        "receipts": {
-            "reuse": "Use for note-taking or craft projects if not thermal paper.",
-            "recycle": "Thermal receipts (shiny paper) contain BPA and should not be recycled or composted. Regular paper receipts can be recycled."
-        },
-        
-        # Fabrics and Textiles
-        "synthetic": {
-            "reuse": "Repurpose for cleaning rags, craft projects, pet bedding, or stuffing for pillows.",
-            "recycle": "Some textile recycling programs accept synthetic fabrics. H&M and other retailers have fabric take-back programs."
-        },
-        "polyester": {
-            "reuse": "Cut into cleaning cloths, use for quilting projects, or repurpose into bags, pillowcases, or other items.",
-            "recycle": "Take to textile recycling programs. Some areas have curbside textile recycling."
-        },
-        "old clothes": {
-            "reuse": "Convert to cleaning rags, craft materials, or upcycle into new garments. Donate wearable clothes.",
-            "recycle": "Textile recycling programs accept worn-out clothes. Some retailers offer take-back programs."
-        },
-        "shirt": {
-            "reuse": "Turn into pillowcases, bags, quilts, or cleaning rags. T-shirts make great yarn for crochet projects.",
-            "recycle": "Donate wearable shirts to charity. Recycle unwearable shirts through textile recycling programs."
-        },
-        "nylon": {
-            "reuse": "Old nylon stockings can be used for gardening, straining, cleaning, or craft projects.",
-            "recycle": "Some specialty recycling programs accept nylon. Check with manufacturers like Patagonia or TerraCycle."
-        },
-        "carpet": {
-            "reuse": "Cut into rugs, door mats, or cat scratching posts. Use under furniture to prevent floor scratches.",
-            "recycle": "Some carpet manufacturers have take-back programs. Check with local carpet retailers."
-        },
-        
-        # Media and Data Storage
-        "cd": {
-            "reuse": "Create reflective decorations, coasters, art projects, or garden bird deterrents.",
-            "recycle": "Specialized e-waste recycling centers can process CDs and DVDs. Cannot go in curbside recycling."
-        },
-        "dvd": {
-            "reuse": "Use for decorative projects, mosaic art, reflective garden features, or craft projects.",
-            "recycle": "Take to electronics recycling centers. Best Buy and other retailers may accept them for recycling."
-        },
-        "video tape": {
-            "reuse": "The tape inside can be used for craft projects, binding materials, or decorative elements.",
-            "recycle": "Requires specialty e-waste recycling. GreenDisk and similar services accept media for recycling."
-        },
-        "cassette tape": {
-            "reuse": "Cases can be repurposed for small item storage. Tape can be used in art projects.",
-            "recycle": "Specialized e-waste recycling is required. Not accepted in curbside recycling."
-        },
-        "floppy disk": {
-            "reuse": "Repurpose as coasters, notebook covers, or decorative items. Can be disassembled for craft parts.",
-            "recycle": "Specialized e-waste recycling is required. Not accepted in regular recycling."
-        },
-        
-        # Composites and Multi-material Items
-        "shoes": {
-            "reuse": "Donate wearable shoes. Repurpose parts for crafts or garden projects.",
-            "recycle": "Nike's Reuse-A-Shoe program and similar initiatives recycle athletic shoes into playground surfaces."
-        },
-        "backpack": {
-            "reuse": "Repair and donate usable backpacks. Repurpose fabric, zippers, and straps for other projects.",
-            "recycle": "Some textile recycling programs may accept them. The North Face and similar programs take worn gear."
-        },
-        "umbrella": {
-            "reuse": "Fabric can be used for small waterproof projects. Frame can be used for garden supports or craft projects.",
-            "recycle": "Separate materials (metal frame and synthetic fabric) and recycle appropriately. Full umbrellas not recyclable."
-        },
-        "mattress": {
-            "reuse": "Foam can be repurposed for cushions or pet beds. Springs can be used for garden trellises.",
-            "recycle": "Specialized mattress recycling facilities can break down components. Many states have mattress recycling programs."
-        },
-        
-        # Miscellaneous
-        "blister pack": {
-            "reuse": "Small clear blister packs can be used for bead or craft supply storage, seed starting, or organizing small items.",
-            "recycle": "Generally not recyclable in curbside programs. TerraCycle has specialty programs for some types."
-        },
-        "paint can": {
-            "reuse": "Clean metal paint cans can be used for storage or organization. Use as planters with drainage holes.",
-            "recycle": "Metal paint cans can be recycled once completely empty and dry. Latex paint residue can be dried out."
-        },
-        "ceramic": {
-            "reuse": "Broken ceramics can be used for mosaic projects, drainage in planters, or garden decoration.",
-            "recycle": "Not recyclable in conventional recycling. Clean, usable items should be donated."
-        },
-        "fiberglass": {
-            "reuse": "Small fiberglass pieces can be used for insulation projects or DIY auto body repairs.",
-            "recycle": "Specialized recycling is required. Check with manufacturers or construction waste recyclers."
-        },
-        "composite wood": {
-            "reuse": "Repurpose for smaller projects, garden edging, or raised bed construction.",
-            "recycle": "Not recyclable in conventional systems due to adhesives and mixed materials. Reuse is preferred."
-        }
-    }
-    
-    # Search for keywords in the material string
-    for key, tips in materials_database.items():
-        if key in material:
-            return tips["reuse"], tips["recycle"]
-    
-    # Check for broader categories with partial matching
-    for key, tips in materials_database.items():
-        if any(word in material for word in key.split()):
-            return tips["reuse"], tips["recycle"]
-    
-    # Default response if no match found
-    return ("Try creative repurposing based on the material properties. Consider if it can be cut, shaped, or combined with other materials for new uses.", 
-            "Research specialized recycling options for this material. Contact your local waste management authority or search Earth911.com for recycling locations.")
-
 # Generate shareable URL function
 def generate_share_url(page, params=None):
     """Generate a shareable URL for the current state of the app."""
@@ -535,11 +102,13 @@ def generate_share_url(page, params=None):
 # Sidebar for navigation with icon
 sidebar_col1, sidebar_col2 = st.sidebar.columns([1, 4])
 with sidebar_col1:
-    st.image(icon, width=50)
+    st.image(load_icon(50), width=50)
 with sidebar_col2:
     st.title("Navigation")
     
 page = st.sidebar.radio("Go to", ["Utility Usage Tracker", "Materials Recycling Guide", "AI Insights Dashboard", "History"])
+st.sidebar.text_input("Household ID", key="household",
+                      help="Utility history, trends and insights are kept per household. Anyone with this ID shares its data.")
 
 # Welcome message and basic instructions
 st.sidebar.info("""
@@ -586,11 +155,13 @@ if popular_materials:
         st.sidebar.markdown(f"- **{material.name.title()}** (searched {material.search_count} times)")
 
 # Add a section for database stats
-utility_count = len(db.get_utility_history(1000))
+utility_count = db.count_utility_records(household)
 st.sidebar.title("Database Stats")
+cache_stats = smart_assistant_cache.stats()
 st.sidebar.markdown(f"""
-- **{utility_count}** utility records saved
+- **{utility_count}** utility records saved for this household
 - **{len(popular_materials)}** materials in database
+- **{cache_stats['hit_rate']:.0%}** material analysis cache hit rate ({cache_stats['hits']} hits, {cache_stats['misses']} misses)
 """)
 
 # Main application logic
@@ -609,6 +180,20 @@ if page == "Utility Usage Tracker":
     </div>
     """, unsafe_allow_html=True)
 
+    # Bulk import for households with many meter readings
+    with st.expander("📤 Bulk upload meter readings (CSV or JSONL)"):
+        st.markdown("Columns: `water_gallons`, `electricity_kwh`, `gas_cubic_m` and an optional ISO 8601 `timestamp`.")
+        uploaded_readings = st.file_uploader("Meter readings file", type=["csv", "jsonl"])
+        if uploaded_readings is not None and st.button("Import readings", key="import_readings_button"):
+            import ingest
+            import pandas as pd
+            with st.spinner("Importing readings..."):
+                report = ingest.ingest_upload(uploaded_readings, tenant=household)
+            st.success(f"✅ Imported {report.accepted} readings.")
+            if report.rejected:
+                st.warning(f"⚠️ {report.rejected} rows were rejected.")
+                st.dataframe(pd.DataFrame(report.errors, columns=['Line', 'Reason']), use_container_width=True)
+
     # Create columns for inputs
     col1, col2, col3 = st.columns(3)
     
@@ -632,8 +217,12 @@ if page == "Utility Usage Tracker":
     
     # Handle assess button click
     if assess_button or save_button:
+        # Charting libraries are imported on first use, so pages without charts never load them
+        import pandas as pd
+        import charts
+        
         # Get AI-enhanced assessment
-        water_status, electricity_status, gas_status, ai_analysis = assess_usage_with_ai(water, electricity, gas)
+        water_status, electricity_status, gas_status, ai_analysis = assess_usage_with_ai(water, electricity, gas, household, eco_ai)
         
         # Create a DataFrame for visualization
         data = {
@@ -646,7 +235,7 @@ if page == "Utility Usage Tracker":
         
         # Save to database if save button was clicked
         if save_button:
-            db.save_utility_usage(water, electricity, gas, water_status, electricity_status, gas_status)
+            db.save_utility_usage(water, electricity, gas, water_status, electricity_status, gas_status, household)
             st.session_state.show_saved = True
             st.session_state.saved_message = "✅ Utility data saved to database successfully!"
             st.success("✅ Utility data saved to database successfully!")
@@ -699,34 +288,8 @@ if page == "Utility Usage Tracker":
         # Visualize the results with a bar chart
         st.subheader("Visual Comparison")
         
-        # Create reference data for normal ranges
-        reference_data = {
-            'Utility': ['Water Min', 'Water Max', 'Electricity Min', 'Electricity Max', 'Gas Min', 'Gas Max'],
-            'Value': [3000, 12000, 300, 800, 50, 150]
-        }
-        ref_df = pd.DataFrame(reference_data)
-        
         # Create chart showing user values compared to normal ranges
-        fig = px.bar(
-            df, 
-            x='Utility', 
-            y='Usage', 
-            color='Status',
-            color_discrete_map={'Low': 'orange', 'Normal': 'green', 'High': 'red'},
-            title="Your Usage Compared to Normal Ranges"
-        )
-        
-        # Add normal range indicators as horizontal lines
-        fig.add_hline(y=3000, line_dash="dash", line_color="green", annotation_text="Water Min")
-        fig.add_hline(y=12000, line_dash="dash", line_color="green", annotation_text="Water Max")
-        
-        # Update layout for better visibility
-        fig.update_layout(
-            xaxis_title="Utility Type",
-            yaxis_title="Usage Value (Note: Units differ)",
-            legend_title="Status"
-        )
-        
+        fig = charts.usage_bar_chart(df)
         st.plotly_chart(fig, use_container_width=True)
         
         # Display AI predictions and recommendations
@@ -807,21 +370,16 @@ elif page == "AI Insights Dashboard":
     Advanced machine learning analytics for your utility usage patterns and sustainability recommendations.
     This dashboard uses trained AI models to provide deep insights into your consumption behavior.
     """)
+    import pandas as pd
+    import charts
     
-    if not st.session_state.ai_initialized:
+    if not eco_ai.is_trained:
         st.warning("AI system is still initializing. Please wait a moment and refresh the page.")
         st.stop()
     
     # Load historical data for analysis
-    historical_data = db.get_utility_history(limit=100)
-    data_for_analysis = []
-    for record in historical_data:
-        data_for_analysis.append({
-            'timestamp': record.timestamp,
-            'water_gallons': record.water_gallons,
-            'electricity_kwh': record.electricity_kwh,
-            'gas_cubic_m': record.gas_cubic_m
-        })
+    history_df = db.get_utility_dataframe(limit=100, tenant=household)
+    data_for_analysis = history_df[['timestamp', 'water_gallons', 'electricity_kwh', 'gas_cubic_m']].to_dict('records')
     
     if len(data_for_analysis) < 3:
         st.info("Add more utility usage data to unlock comprehensive AI insights.")
@@ -833,7 +391,7 @@ elif page == "AI Insights Dashboard":
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Model Status", "Active" if eco_ai.is_trained else "Initializing")
+        st.metric("Model Status", "Active" if eco_ai.is_trained else "Initializing", delta=f"Version {model_version}", delta_color="off")
     
     with col2:
         st.metric("Training Data", f"{len(data_for_analysis)} records")
@@ -883,57 +441,43 @@ elif page == "AI Insights Dashboard":
             efficiency = patterns['efficiency_score']
             
             # Create gauge chart for efficiency
-            fig = go.Figure(go.Indicator(
-                mode = "gauge+number+delta",
-                value = efficiency,
-                domain = {'x': [0, 1], 'y': [0, 1]},
-                title = {'text': "Efficiency Score"},
-                delta = {'reference': 70},
-                gauge = {
-                    'axis': {'range': [None, 100]},
-                    'bar': {'color': "darkblue"},
-                    'steps': [
-                        {'range': [0, 50], 'color': "lightgray"},
-                        {'range': [50, 70], 'color': "yellow"},
-                        {'range': [70, 100], 'color': "green"}
-                    ],
-                    'threshold': {
-                        'line': {'color': "red", 'width': 4},
-                        'thickness': 0.75,
-                        'value': 90
-                    }
-                }
-            ))
-            fig.update_layout(height=400)
+            fig = charts.efficiency_gauge(efficiency)
             st.plotly_chart(fig, use_container_width=True)
     
     # Historical trend visualization
     if len(data_for_analysis) > 5:
         st.subheader("Historical Usage Trends")
         
-        df = pd.DataFrame(data_for_analysis)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df = df.sort_values('timestamp')
+        # Long histories are charted from rollups matching their time span
+        granularity = choose_granularity(usage_rollups.span(household))
+        if granularity:
+            rollup = usage_rollups.query(granularity, tenant=household)
+            df = pd.DataFrame({
+                'timestamp': rollup['period'],
+                'water_gallons': rollup['water_gallons_mean'],
+                'electricity_kwh': rollup['electricity_kwh_mean'],
+                'gas_cubic_m': rollup['gas_cubic_m_mean']
+            })
+        else:
+            # History columns are already timestamp-ordered datetimes
+            df = history_df
         
         # Create trend charts
         trend_cols = st.columns(3)
         
         with trend_cols[0]:
-            fig_water = px.line(df, x='timestamp', y='water_gallons', 
-                              title='Water Usage Trend',
-                              labels={'water_gallons': 'Gallons', 'timestamp': 'Date'})
+            fig_water = charts.line_chart(df, 'timestamp', 'water_gallons', 'Water Usage Trend',
+                                          labels={'water_gallons': 'Gallons', 'timestamp': 'Date'})
             st.plotly_chart(fig_water, use_container_width=True)
         
         with trend_cols[1]:
-            fig_elec = px.line(df, x='timestamp', y='electricity_kwh', 
-                             title='Electricity Usage Trend',
-                             labels={'electricity_kwh': 'kWh', 'timestamp': 'Date'})
+            fig_elec = charts.line_chart(df, 'timestamp', 'electricity_kwh', 'Electricity Usage Trend',
+                                         labels={'electricity_kwh': 'kWh', 'timestamp': 'Date'})
             st.plotly_chart(fig_elec, use_container_width=True)
         
         with trend_cols[2]:
-            fig_gas = px.line(df, x='timestamp', y='gas_cubic_m', 
-                            title='Gas Usage Trend',
-                            labels={'gas_cubic_m': 'Cubic Meters', 'timestamp': 'Date'})
+            fig_gas = charts.line_chart(df, 'timestamp', 'gas_cubic_m', 'Gas Usage Trend',
+                                        labels={'gas_cubic_m': 'Cubic Meters', 'timestamp': 'Date'})
             st.plotly_chart(fig_gas, use_container_width=True)
     
     # AI predictions section
@@ -942,7 +486,7 @@ elif page == "AI Insights Dashboard":
         
         # Get latest data point for prediction
         latest_data = data_for_analysis[-1]
-        predictions = eco_ai.predict_usage(latest_data)
+        predictions = eco_ai.predict_usage(latest_data, household)
         
         if predictions:
             st.write("**AI Predictions for Next Period (based on your usage patterns):**")
@@ -1029,56 +573,28 @@ elif page == "AI Insights Dashboard":
     
     popular_materials = db.get_popular_materials(10)
     if popular_materials:
-        material_analysis = []
-        for material in popular_materials:
-            try:
-                ai_analysis = material_ai.analyze_material(material.name)
-                
-                # Ensure all values are properly handled
-                sustainability_score = ai_analysis.get('sustainability_score', 5.0)
-                environmental_impact = ai_analysis.get('environmental_impact', 5.0)
-                category = ai_analysis.get('category', 'unknown')
-                
-                # Convert to numeric if it's not already
-                if not isinstance(environmental_impact, (int, float)):
-                    environmental_impact = 5.0
-                
-                # Determine impact level based on environmental impact score
-                if environmental_impact > 7:
-                    impact_level = 'High'
-                elif environmental_impact > 4:
-                    impact_level = 'Medium'
-                else:
-                    impact_level = 'Low'
-                
-                material_analysis.append({
-                    'Material': material.name.title(),
-                    'Searches': material.search_count,
-                    'Sustainability Score': round(sustainability_score, 1),
-                    'Category': category.title(),
-                    'Impact Level': impact_level,
-                    'Environmental Impact': round(environmental_impact, 1)
-                })
-            except Exception as e:
-                # Handle any errors gracefully
-                st.warning(f"Could not analyze material: {material.name}")
-                continue
+        material_df = None
+        try:
+            # Score every popular material in one batch
+            scores = material_ai.analyze_materials(material.name for material in popular_materials)
+            environmental_impact = scores['environmental_impact'].to_numpy(dtype=float)
+            
+            material_df = pd.DataFrame({
+                'Material': [material.name.title() for material in popular_materials],
+                'Searches': [material.search_count for material in popular_materials],
+                'Sustainability Score': scores['sustainability_score'].round(1),
+                'Category': scores['category'].str.title(),
+                # Impact level from the environmental impact score
+                'Impact Level': np.select([environmental_impact > 7, environmental_impact > 4], ['High', 'Medium'], 'Low'),
+                'Environmental Impact': scores['environmental_impact'].round(1)
+            })
+        except Exception:
+            # Handle any errors gracefully
+            st.warning("Could not analyze popular materials")
         
-        if material_analysis:
-            material_df = pd.DataFrame(material_analysis)
-            
+        if material_df is not None and len(material_df):
             # Display material analysis chart
-            fig_materials = px.scatter(
-                material_df, 
-                x='Searches', 
-                y='Sustainability Score',
-                size='Searches',
-                color='Impact Level',
-                hover_data=['Material', 'Category', 'Environmental Impact'],
-                title='Material Sustainability Analysis',
-                color_discrete_map={'Low': 'green', 'Medium': 'orange', 'High': 'red'}
-            )
-            fig_materials.update_layout(height=500)
+            fig_materials = charts.material_scatter(material_df)
             st.plotly_chart(fig_materials, use_container_width=True)
             
             # Show summary statistics
@@ -1109,10 +625,9 @@ elif page == "AI Insights Dashboard":
     
     if data_for_analysis and len(data_for_analysis) > 3:
         # Get average usage for recommendations
-        df = pd.DataFrame(data_for_analysis)
-        avg_water = df['water_gallons'].mean()
-        avg_electricity = df['electricity_kwh'].mean()
-        avg_gas = df['gas_cubic_m'].mean()
+        avg_water = history_df['water_gallons'].mean()
+        avg_electricity = history_df['electricity_kwh'].mean()
+        avg_gas = history_df['gas_cubic_m'].mean()
         
         recommendations = eco_ai.generate_recommendations(avg_water, avg_electricity, avg_gas)
         
@@ -1132,54 +647,88 @@ elif page == "History":
     st.markdown("""
     View your previously saved utility usage data and track patterns over time.
     """)
-    
-    # Get utility history from database
-    history = db.get_utility_history(10)
-    
-    if history:
-        # Create columns for the table
-        history_data = {
-            'Date': [h.timestamp.strftime("%Y-%m-%d %H:%M") for h in history],
-            'Water (gallons)': [h.water_gallons for h in history],
-            'Electricity (kWh)': [h.electricity_kwh for h in history],
-            'Gas (m³)': [h.gas_cubic_m for h in history],
-            'Water Status': [h.water_status for h in history],
-            'Electricity Status': [h.electricity_status for h in history],
-            'Gas Status': [h.gas_status for h in history]
-        }
-        
-        history_df = pd.DataFrame(history_data)
+    import pandas as pd
+    import charts
+    dataframe_seconds = metrics.histogram("ecoaudit_dataframe_seconds", "Time spent building page DataFrames.")
+    
+    record_count = db.count_utility_records(household)
+    if record_count:
+        # Filter by date and page through the matching readings, newest first
+        filter_col1, filter_col2 = st.columns([3, 1])
+        with filter_col1:
+            date_range = st.date_input("Date range", value=())
+        with filter_col2:
+            page_size = st.selectbox("Rows per page", [10, 25, 100])
+        start = datetime.combine(date_range[0], datetime.min.time()) if len(date_range) else None
+        end = datetime.combine(date_range[-1], datetime.min.time()) + timedelta(days=1) if len(date_range) else None
+        
+        # Cursors for the pages visited so far; changing a filter starts over
+        filters = (household, start, end, page_size)
+        if st.session_state.get('history_filters') != filters:
+            st.session_state.history_filters = filters
+            st.session_state.history_cursors = [None]
+        cursors = st.session_state.history_cursors
+        page_columns, next_cursor = db.query_utility_history(start, end, page_size, cursors[-1], tenant=household)
+        with metrics.timer(dataframe_seconds, page="History"):
+            history = db.columns_to_dataframe(page_columns)
+        
+    if record_count and not len(history):
+        st.info("No utility usage was saved in this date range.")
+    elif record_count:
+        # Rename the stored columns for the table
+        with metrics.timer(dataframe_seconds, page="History"):
+            history_df = history.rename(columns={
+                'water_gallons': 'Water (gallons)',
+                'electricity_kwh': 'Electricity (kWh)',
+                'gas_cubic_m': 'Gas (m³)',
+                'water_status': 'Water Status',
+                'electricity_status': 'Electricity Status',
+                'gas_status': 'Gas Status'
+            })
+            history_df.insert(0, 'Date', history_df.pop('timestamp').dt.strftime("%Y-%m-%d %H:%M"))
         st.dataframe(history_df, use_container_width=True)
         
+        nav_col1, nav_col2, nav_col3 = st.columns([1, 2, 1])
+        with nav_col1:
+            if st.button("← Newer", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with nav_col2:
+            st.caption(f"Page {len(cursors)}")
+        with nav_col3:
+            if st.button("Older →", disabled=next_cursor is None):
+                cursors.append(next_cursor)
+                st.rerun()
+        
         # Visualize historical data
         st.subheader("Historical Data Visualization")
         
+        # Charts read pre-aggregated rollups sized to the time range, not every raw reading
+        resolution = st.selectbox("Chart resolution", ["Auto", "Latest readings", "Daily", "Weekly", "Monthly"])
+        granularity = {"Latest readings": None, "Daily": "day", "Weekly": "week", "Monthly": "month"}.get(resolution)
+        if resolution == "Auto":
+            granularity = choose_granularity(end - start if start else usage_rollups.span(household))
+        
+        if granularity:
+            rollup = usage_rollups.query(granularity, start, end - timedelta(microseconds=1) if end else None, household)
+            chart_df = pd.DataFrame({
+                'Date': rollup['period'],
+                'Water (gallons)': rollup['water_gallons_mean'],
+                'Electricity (kWh)': rollup['electricity_kwh_mean'],
+                'Gas (m³)': rollup['gas_cubic_m_mean']
+            })
+            st.caption(f"Average usage per {granularity}")
+        else:
+            chart_df = history_df.iloc[::-1]
+        
         # Create line chart of water usage over time
-        water_fig = px.line(
-            history_df, 
-            x='Date', 
-            y='Water (gallons)', 
-            title="Water Usage History",
-            markers=True
-        )
+        water_fig = charts.line_chart(chart_df, 'Date', 'Water (gallons)', "Water Usage History", markers=True)
         
         # Create line chart of electricity usage over time
-        electricity_fig = px.line(
-            history_df, 
-            x='Date', 
-            y='Electricity (kWh)', 
-            title="Electricity Usage History",
-            markers=True
-        )
+        electricity_fig = charts.line_chart(chart_df, 'Date', 'Electricity (kWh)', "Electricity Usage History", markers=True)
         
         # Create line chart of gas usage over time
-        gas_fig = px.line(
-            history_df, 
-            x='Date', 
-            y='Gas (m³)', 
-            title="Gas Usage History",
-            markers=True
-        )
+        gas_fig = charts.line_chart(chart_df, 'Date', 'Gas (m³)', "Gas Usage History", markers=True)
         
         col1, col2 = st.columns(2)
         
@@ -1210,6 +759,12 @@ elif page == "Materials Recycling Guide":
     # Create a search input for materials
     material = st.text_input("Enter material to get recycling/reuse guidance (e.g., plastic bottle, glass, e-waste):", "")
     
+    # Offer close matches when the input looks like a typo
+    if material:
+        suggestions = suggest_materials(material)
+        if suggestions:
+            st.caption("Did you mean: " + ", ".join(f"**{name}**" for name in suggestions) + "?")
+    
     # Show some examples for user guidance
     with st.expander("Example materials you can search for"):
         st.markdown("""
@@ -1375,3 +930,8 @@ st.sidebar.info("""
 # Footer
 st.markdown("---")
 st.markdown("© 2025 EcoAudit by Team EcoAudit - Helping you monitor your utility usage and reduce waste.")
+
+# Reruns cut short by st.rerun() or an exception are not recorded
+metrics.histogram("ecoaudit_page_rerun_seconds", "Wall time of a full script rerun.").labels(page=page).observe(
+    time.perf_counter() - rerun_started
+)
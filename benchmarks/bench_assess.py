@@ -0,0 +1,47 @@
+"""Compare EcoAI.assess_usage_batch with a per-row assess_usage loop.
+
+    python benchmarks/bench_assess.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("ECOAUDIT_DB", ":memory:")
+
+from simple_ai_models import EcoAI, status_labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    eco_ai = EcoAI()
+    rng = np.random.default_rng(args.seed)
+    readings = rng.uniform([1000, 100, 20], [15000, 1000, 200], size=(args.rows, 3))
+
+    started = time.perf_counter()
+    codes = eco_ai.assess_usage_batch(readings)
+    batch_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    looped = [eco_ai.assess_usage(w, e, g, []) for w, e, g in readings.tolist()]
+    loop_s = time.perf_counter() - started
+
+    assert status_labels(codes).tolist() == [list(row) for row in looped], "batch and loop disagree"
+    print(f"{args.rows:,} rows: loop {loop_s:.2f}s ({args.rows / loop_s:,.0f} rows/s), "
+          f"batch {batch_s * 1e3:.1f} ms ({args.rows / batch_s:,.0f} rows/s), speedup {loop_s / batch_s:,.0f}x")
+
+    baselines = rng.uniform([4000, 350, 60], [9000, 700, 120], size=(args.rows, 3))
+    started = time.perf_counter()
+    eco_ai.assess_usage_batch(readings, baselines=baselines)
+    print(f"with per-household baselines: {(time.perf_counter() - started) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Latency of fuzzy material search against exact matching at catalog scale.
+
+Builds a TrigramIndex of synthetic material names, then times misspelled
+queries (fuzzy path) and catalog hits (exact path).
+
+    python benchmarks/bench_fuzzy.py --size 50000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import materials
+
+QUALIFIERS = ["old", "broken", "used", "small", "large", "clear", "black", "white", "recycled", "scrap",
+              "kitchen", "garden", "office", "car", "kids", "foam", "coated", "printed", "empty", "spare"]
+
+
+def synthetic_names(size, rng):
+    keys = list(materials.MATERIALS_DATABASE)
+    names = set(keys)
+    while len(names) < size:
+        words = rng.sample(QUALIFIERS, rng.randint(1, 2)) + [rng.choice(keys)]
+        names.add(" ".join(words) + f" {rng.randint(0, 999)}")
+    return list(names)
+
+
+def misspell(word, rng):
+    chars = list(word)
+    i = rng.randrange(len(chars))
+    edit = rng.choice(("drop", "swap", "replace"))
+    if edit == "drop" and len(chars) > 3:
+        del chars[i]
+    elif edit == "swap" and i + 1 < len(chars):
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    else:
+        chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return "".join(chars)
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {p: samples[min(int(len(samples) * p / 100), len(samples) - 1)] * 1e3 for p in (50, 95, 99)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = synthetic_names(args.size, rng)
+    started = time.perf_counter()
+    index = materials.TrigramIndex(names)
+    print(f"indexed {len(index)} names in {time.perf_counter() - started:.2f}s")
+
+    keys = list(materials.MATERIALS_DATABASE)
+    fuzzy, exact, hits = [], [], 0
+    for _ in range(args.queries):
+        key = rng.choice(keys)
+        query = misspell(key, rng)
+        started = time.perf_counter()
+        results = index.search(query)
+        fuzzy.append(time.perf_counter() - started)
+        hits += any(name == key for name, _ in results)
+
+        started = time.perf_counter()
+        materials.matcher.match(key)
+        exact.append(time.perf_counter() - started)
+
+    for label, samples in (("fuzzy", fuzzy), ("exact", exact)):
+        p = percentiles(samples)
+        print(f"{label}: p50 {p[50]:.3f} ms, p95 {p[95]:.3f} ms, p99 {p[99]:.3f} ms")
+    print(f"misspelled key recovered in top 5: {hits / args.queries:.1%}")
+
+
+if __name__ == "__main__":
+    main()
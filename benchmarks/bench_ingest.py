@@ -0,0 +1,89 @@
+"""Throughput of the bulk ingestion pipeline on synthetic CSV and JSONL files.
+
+    python benchmarks/bench_ingest.py --rows 1000000
+
+Files are loaded through ``ingest.py``'s command line, one household per
+format, with the process-wide model registry following every saved batch as
+it does in production. A probe thread calls ``registry.current()`` throughout
+and the longest call is reported, since every rerun and API request makes it.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("ECOAUDIT_DB", ":memory:")
+
+import database as db
+import ingest
+from model_registry import registry
+
+
+def write_files(directory, rows, seed):
+    rng = np.random.default_rng(seed)
+    usage = rng.uniform([1000, 100, 20], [15000, 1000, 200], size=(rows, 3)).round(1)
+    start = np.datetime64("2020-01-01T00:00")
+    timestamps = (start + np.arange(rows) * np.timedelta64(1, "h")).astype(str)
+    csv_path = os.path.join(directory, "readings.csv")
+    jsonl_path = os.path.join(directory, "readings.jsonl")
+    with open(csv_path, "w") as f:
+        f.write("timestamp,water_gallons,electricity_kwh,gas_cubic_m\n")
+        for ts, (water, electricity, gas) in zip(timestamps.tolist(), usage.tolist()):
+            f.write(f"{ts},{water},{electricity},{gas}\n")
+        f.write("2021-01-01T00:00,oops,1,1\n")
+    with open(jsonl_path, "w") as f:
+        for ts, (water, electricity, gas) in zip(timestamps.tolist(), usage.tolist()):
+            f.write(json.dumps({"timestamp": ts, "water_gallons": water, "electricity_kwh": electricity, "gas_cubic_m": gas}) + "\n")
+    return {"csv": csv_path, "jsonl": jsonl_path}
+
+
+@contextlib.contextmanager
+def current_model_probe(interval=0.001):
+    """Yield a list that ends up holding the longest ``registry.current()`` call while the block ran."""
+    longest = [0.0]
+    done = threading.Event()
+
+    def probe():
+        while not done.wait(interval):
+            started = time.perf_counter()
+            registry.current()
+            longest[0] = max(longest[0], time.perf_counter() - started)
+
+    thread = threading.Thread(target=probe, daemon=True)
+    thread.start()
+    try:
+        yield longest
+    finally:
+        done.set()
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_files(tmp, args.rows, args.seed)
+        for fmt, path in paths.items():
+            with current_model_probe() as longest:
+                started = time.perf_counter()
+                ingest.main([path, "--batch-size", str(args.batch_size), "--tenant", fmt])
+                elapsed = time.perf_counter() - started
+            stored = db.count_utility_records(fmt)
+            assert stored == args.rows, stored
+            print(f"{fmt:>5}: {stored:,} rows in {elapsed:.2f}s = {stored / elapsed:,.0f} rows/s, "
+                  f"longest registry.current() {longest[0] * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compare get_popular_materials against a full sort over the catalog.
+
+    python benchmarks/bench_popular.py --sizes 100000 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("ECOAUDIT_DB", ":memory:")
+
+import database as db
+
+
+def build_store(size, searches, seed=0):
+    rng = random.Random(seed)
+    store = db.MemoryStore()
+    for i in range(size):
+        store.save_material(f"material {i}", "reuse", "recycle")
+    # Zipf-like skew: low ids are searched far more often
+    for _ in range(searches):
+        store.save_material(f"material {int(size ** rng.random()) - 1}", "reuse", "recycle")
+    return store
+
+
+def per_call(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        store = build_store(size, searches=size)
+        full_sort = lambda: sorted(store.material_data.values(), key=lambda x: -x.search_count)[:args.k]
+        indexed = lambda: store.popular_materials(args.k)
+        expected = [m.search_count for m in full_sort()]
+        assert [m.search_count for m in indexed()] == expected, "top-k mismatch"
+
+        sort_s = per_call(full_sort, args.repeat)
+        index_s = per_call(indexed, args.repeat * 1000)
+        print(f"{size:>9} materials: full sort {sort_s * 1e3:9.2f} ms, "
+              f"index {index_s * 1e6:7.2f} us, speedup {sort_s / index_s:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Import-time profile and cold-start / rerun latency of the app.
+
+    python benchmarks/bench_startup.py --page "Materials Recycling Guide" --reruns 20
+
+The import profile runs the app's imports under ``python -X importtime`` in a
+fresh interpreter and lists the slowest modules by cumulative time. The app
+timings run each page in another fresh interpreter through Streamlit's
+AppTest: the first run (cold imports and model load), the first render of the
+page, and the mean of later reruns, plus which heavy libraries were loaded.
+AppTest adds its own per-run overhead, so compare these timings with each
+other rather than with a browser session.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+MODULES = "streamlit, database, materials, cache, model_registry, rollups"
+HEAVY = ("numpy", "pandas", "plotly", "PIL")
+PAGES = ["Utility Usage Tracker", "Materials Recycling Guide", "AI Insights Dashboard", "History"]
+
+APP_RUN = """
+import json, os, sys, time
+from streamlit.testing.v1 import AppTest
+page, reruns = sys.argv[1], int(sys.argv[2])
+started = time.perf_counter()
+at = AppTest.from_file(os.path.join({root!r}, "app.py"), default_timeout=120).run()
+first = time.perf_counter() - started
+started = time.perf_counter()
+at.sidebar.radio[0].set_value(page).run()
+switch = time.perf_counter() - started
+started = time.perf_counter()
+for _ in range(reruns):
+    at.run()
+rerun = (time.perf_counter() - started) / max(reruns, 1)
+assert not at.exception, at.exception
+print(json.dumps({{"first_run_s": first, "page_switch_s": switch, "rerun_s": rerun,
+                  "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def _env():
+    return {**os.environ, "ECOAUDIT_DB": os.environ.get("ECOAUDIT_DB", ":memory:")}
+
+
+def import_profile(modules):
+    """``(name, self_us, cumulative_us)`` for every module imported by ``import modules``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modules}"],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def app_timings(page, reruns):
+    script = APP_RUN.format(root=os.path.abspath(ROOT), heavy=HEAVY)
+    result = subprocess.run(
+        [sys.executable, "-c", script, page, str(reruns)],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", default=MODULES, help="comma-separated imports to profile")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--page", action="append", choices=PAGES, help="page to time (repeatable; default all)")
+    parser.add_argument("--reruns", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = import_profile(args.modules)
+    top_level = {name.strip() for name in args.modules.split(",")}
+    total_us = sum(cumulative for name, _, cumulative in rows if name in top_level)
+    print(f"import {args.modules}: {total_us / 1000:.1f} ms across {len(rows)} modules")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: -row[2])[:args.top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {name}")
+    print(f"heavy libraries imported: {', '.join(name for name in HEAVY if any(row[0] == name for row in rows)) or 'none'}")
+
+    print()
+    for page in args.page or PAGES:
+        timings = app_timings(page, args.reruns)
+        print(f"{page}: first run {timings['first_run_s'] * 1000:.0f} ms, "
+              f"page switch {timings['page_switch_s'] * 1000:.0f} ms, "
+              f"rerun {timings['rerun_s'] * 1000:.1f} ms; loaded {', '.join(timings['loaded']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""Load test: many concurrent browser sessions against one in-process Streamlit worker.
+
+    python benchmarks/loadtest.py --sessions 16 --actions 50
+    python benchmarks/loadtest.py --sessions 1 2 4 8 16 32 --output load.json
+
+Streamlit's AppTest drives one session at a time (it swaps process-wide
+runtime state on every run), so this harness starts a real Streamlit server
+for app.py in a background thread of this process and connects each session
+over the same websocket protocol a browser uses. Every session gets its own
+household and performs ``--actions`` seeded random actions: assessing usage,
+saving it, asking for the AI analysis of a material from workload.py's
+Zipfian search stream, and switching pages. Each script run, from sending
+the widget states to the server reporting the run finished, is one rerun
+sample.
+
+The report gives rerun latency percentiles overall and per action, reruns
+per second across all sessions, and how much the process and the shared
+store, caches and models grew. The server shares this process with the
+database module, so the store is measured directly. Run several
+``--sessions`` counts against the same worker to see where latency climbs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+os.environ.setdefault("ECOAUDIT_DB", ":memory:")
+
+import websockets
+from streamlit import config
+from streamlit.logger import set_log_level
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from streamlit.web.server import Server
+
+import database as db
+import workload
+from cache import smart_assistant_cache
+from model_registry import registry
+
+APP = os.path.join(ROOT, "app.py")
+PAGES = ["Utility Usage Tracker", "Materials Recycling Guide", "AI Insights Dashboard", "History"]
+ACTIONS = {"assess": 4, "save": 3, "material": 3, "page": 2}
+USAGE_INPUTS = {
+    "Water usage (gallons)": (1000, 15000),
+    "Electricity usage (kWh)": (100, 1000),
+    "Gas usage (cubic meters)": (20, 200),
+}
+MATERIAL_INPUT = "Enter material to get recycling/reuse guidance (e.g., plastic bottle, glass, e-waste):"
+
+
+def _rss_mb():
+    """Current resident set size in MB, or the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def footprint():
+    """Size of the process-wide structures every session shares."""
+    tenants = db.get_tenants()
+    stats = {
+        "rss_mb": _rss_mb(),
+        "tenants": len(tenants),
+        "utility_rows": sum(db.count_utility_records(tenant) for tenant in tenants),
+        "smart_assistant_cache": len(smart_assistant_cache),
+        "model_detectors": len(registry.current()[1].detectors),
+    }
+    if isinstance(db.store, db.MemoryStore):
+        stats["materials"] = len(db.store.material_data)
+        stats["utility_column_bytes"] = sum(
+            array.nbytes for columns in db.store.utility_data.values() for array in columns._arrays.values()
+        )
+    if "charts" in sys.modules:
+        stats["figure_cache"] = len(sys.modules["charts"].figure_cache)
+    return stats
+
+
+class Worker:
+    """A Streamlit server for app.py running on its own event loop in a background thread."""
+
+    def __init__(self, port=None):
+        if port is None:
+            with socket.socket() as probe:
+                probe.bind(("127.0.0.1", 0))
+                port = probe.getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        for name, value in {
+            "server.address": "127.0.0.1", "server.port": port, "server.headless": True,
+            "server.enableXsrfProtection": False, "server.fileWatcherType": "none",
+            "browser.gatherUsageStats": False,
+        }.items():
+            config.set_option(name, value)
+        # The app's per-rerun deprecation warnings would drown out the report
+        set_log_level("error")
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(),), name="streamlit-worker", daemon=True)
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._server = Server(APP, is_hello=False)
+        await self._server.start()
+        self._ready.set()
+        await self._server.stopped
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._server.stop)
+        self._thread.join(timeout=10)
+
+
+class Session:
+    """One browser tab: keeps its widget values and sends them with every rerun, as the frontend does."""
+
+    def __init__(self, number, seed, url, timeout):
+        self.rng = random.Random(seed * 100_003 + number)
+        self.queries = workload.material_queries(10**9, seed=seed * 100_003 + number)
+        self.url = url
+        self.timeout = timeout
+        self.samples = []
+        self.widgets = {}
+        self.states = {}
+        self.query_string = ""
+        self.page = PAGES[0]
+
+    async def _rerun(self, action, trigger=None):
+        message = BackMsg()
+        message.rerun_script.query_string = self.query_string
+        message.rerun_script.widget_states.widgets.extend(list(self.states.values()) + ([trigger] if trigger else []))
+        started = time.perf_counter()
+        await self.ws.send(message.SerializeToString())
+        async with asyncio.timeout(self.timeout):
+            while True:
+                reply = ForwardMsg()
+                reply.ParseFromString(await self.ws.recv())
+                kind = reply.WhichOneof("type")
+                if kind == "delta" and reply.delta.WhichOneof("type") == "new_element":
+                    element = reply.delta.new_element
+                    proto = getattr(element, element.WhichOneof("type"))
+                    if element.WhichOneof("type") == "exception":
+                        raise RuntimeError(f"{action}: {proto.type}: {proto.message}")
+                    if getattr(proto, "id", "") and getattr(proto, "label", ""):
+                        self.widgets[proto.label] = proto.id
+                elif kind == "page_info_changed":
+                    self.query_string = reply.page_info_changed.query_string
+                elif kind == "script_finished" and reply.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    break
+        self.samples.append((action, time.perf_counter() - started))
+
+    def _set(self, label, field, value):
+        state = WidgetState(id=self.widgets[label])
+        setattr(state, field, value)
+        self.states[state.id] = state
+
+    async def _go_to(self, page):
+        if self.page != page:
+            self._set("Go to", "string_value", page)
+            await self._rerun("page")
+            self.page = page
+
+    async def act(self, action):
+        if action in ("assess", "save"):
+            await self._go_to("Utility Usage Tracker")
+            for label, (low, high) in USAGE_INPUTS.items():
+                self._set(label, "double_value", round(self.rng.uniform(low, high), 1))
+            button = "Assess Usage" if action == "assess" else "💾 Save to Database"
+            await self._rerun(action, WidgetState(id=self.widgets[button], trigger_value=True))
+        elif action == "material":
+            await self._go_to("Materials Recycling Guide")
+            self._set(MATERIAL_INPUT, "string_value", next(self.queries)[0])
+            await self._rerun("material_input")
+            await self._rerun(action, WidgetState(id=self.widgets["Get AI-Powered Analysis"], trigger_value=True))
+        else:
+            await self._go_to(self.rng.choice([page for page in PAGES if page != self.page]))
+
+    async def play(self, actions, think_time, start):
+        async with websockets.connect(self.url, max_size=None) as self.ws:
+            await self._rerun("first_run")
+            await start.wait()
+            names, weights = list(ACTIONS), list(ACTIONS.values())
+            for _ in range(actions):
+                await self.act(self.rng.choices(names, weights)[0])
+                if think_time:
+                    await asyncio.sleep(self.rng.expovariate(1 / think_time))
+
+
+def percentiles(latencies):
+    values = np.array(latencies) * 1000
+    if not len(values):
+        return {}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"count": len(values), "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "max_ms": values.max()}
+
+
+async def load_test(worker, sessions, actions, think_time=0.0, seed=0, timeout=120.0):
+    before = footprint()
+    players = [Session(number, seed, worker.url, timeout) for number in range(sessions)]
+    start = asyncio.Event()
+    tasks = [asyncio.create_task(player.play(actions, think_time, start)) for player in players]
+    # Everyone connects and renders the first page before the clock starts
+    while not all(player.samples for player in players) and not any(task.done() for task in tasks):
+        await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    start.set()
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+
+    samples = [sample for player in players for sample in player.samples if sample[0] != "first_run"]
+    by_action = {}
+    for action, latency in samples:
+        by_action.setdefault(action, []).append(latency)
+    return {
+        "sessions": sessions,
+        "actions_per_session": actions,
+        "think_time_s": think_time,
+        "elapsed_s": elapsed,
+        "reruns": len(samples),
+        "reruns_per_s": len(samples) / elapsed if elapsed else 0.0,
+        "first_run": percentiles([latency for player in players for action, latency in player.samples if action == "first_run"]),
+        "rerun": percentiles([latency for _, latency in samples]),
+        "actions": {action: percentiles(latencies) for action, latencies in sorted(by_action.items())},
+        "memory": {"before": before, "after": footprint()},
+        "errors": [repr(outcome) for outcome in outcomes if isinstance(outcome, BaseException)],
+    }
+
+
+def report(result):
+    rerun = result["rerun"]
+    print(f"{result['sessions']} sessions: {result['reruns']} reruns in {result['elapsed_s']:.1f}s "
+          f"= {result['reruns_per_s']:.1f} reruns/s; latency p50 {rerun.get('p50_ms', 0):.0f} ms, "
+          f"p95 {rerun.get('p95_ms', 0):.0f} ms, p99 {rerun.get('p99_ms', 0):.0f} ms")
+    for action, stats in result["actions"].items():
+        print(f"  {action:<15} n={stats['count']:<5} p50 {stats['p50_ms']:7.1f} ms  p95 {stats['p95_ms']:7.1f} ms  "
+              f"p99 {stats['p99_ms']:7.1f} ms")
+    before, after = result["memory"]["before"], result["memory"]["after"]
+    print("  growth: " + ", ".join(
+        f"{name} {before.get(name, 0):,.0f} -> {value:,.0f}" for name, value in after.items()
+    ))
+    for error in result["errors"]:
+        print(f"  error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[8], help="concurrent sessions; several values run in turn")
+    parser.add_argument("--actions", type=int, default=30, help="actions per session")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean seconds between a session's actions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds a single rerun may take")
+    parser.add_argument("--port", type=int, help="port for the worker (default: any free port)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="also report the allocation sites that grew most (slows every rerun)")
+    parser.add_argument("--output", help="write the results as JSON here")
+    args = parser.parse_args()
+
+    worker = Worker(args.port)
+    worker.start()
+    if args.tracemalloc:
+        tracemalloc.start()
+        snapshot = tracemalloc.take_snapshot()
+    results = []
+    try:
+        for sessions in args.sessions:
+            result = asyncio.run(load_test(worker, sessions, args.actions, args.think_time, args.seed, args.timeout))
+            report(result)
+            results.append(result)
+    finally:
+        worker.stop()
+    if args.tracemalloc:
+        print("largest allocation growth in the repo's modules:")
+        own = [tracemalloc.Filter(True, os.path.join(os.path.abspath(ROOT), "*.py"))]
+        for stat in tracemalloc.take_snapshot().filter_traces(own).compare_to(snapshot.filter_traces(own), "lineno")[:10]:
+            print(f"  {stat}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, default=float)
+    sys.exit(1 if any(result["errors"] for result in results) else 0)
+
+
+if __name__ == "__main__":
+    main()
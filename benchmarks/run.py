@@ -0,0 +1,204 @@
+"""Benchmark suite for the storage, model and material lookup hot paths.
+
+    python benchmarks/run.py --sizes 100 1000 10000 --output results.json
+    python benchmarks/run.py --compare results.json --threshold 0.25
+
+For each size the store is rebuilt with that many utility readings and saved
+materials from a fixed seed, and every case is timed over ``--rounds`` rounds
+of enough calls to last ``--min-time`` seconds each, with garbage collection
+paused. Results are per-call seconds (median, min and mean over rounds) and
+are written as JSON together with the interpreter, library versions and git
+revision. ``--compare`` reports cases whose median got slower than a previous
+run by more than ``--threshold`` and exits non-zero if any did.
+
+Everything is imported from database, core and simple_ai_models, never app.py,
+so the suite runs without Streamlit. The model registry is never started, so
+saves are timed without its model updates and background refits.
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+os.environ.setdefault("ECOAUDIT_DB", ":memory:")
+
+import core
+import database as db
+from cache import smart_assistant_cache
+from materials import MATERIALS_DATABASE
+from simple_ai_models import EcoAI, MaterialAI
+
+TENANT = "bench"
+
+
+def populate(size, rng):
+    """Fill the active store with ``size`` hourly readings and ``size`` materials with skewed search counts."""
+    usage = rng.uniform([1000, 100, 20], [15000, 1000, 200], size=(size, 3))
+    start = db.to_epoch_us(datetime.datetime(2020, 1, 1))
+    codes = EcoAI().assess_usage_batch(usage)
+    db.save_utility_batch({
+        "timestamp": start + np.arange(size, dtype=np.int64) * 3_600_000_000,
+        "water_gallons": usage[:, 0], "electricity_kwh": usage[:, 1], "gas_cubic_m": usage[:, 2],
+        "water_status": codes[:, 0], "electricity_status": codes[:, 1], "gas_status": codes[:, 2],
+    }, TENANT)
+    for i in range(size):
+        db.store.save_material(f"material {i}", "reuse", "recycle")
+    # Zipf-like skew: low ids are searched far more often
+    for i in (size ** rng.random(size)).astype(int) - 1:
+        db.store.save_material(f"material {i}", "reuse", "recycle")
+
+
+def cases(size):
+    """``(name, callable)`` pairs to time against a store populated with ``size`` rows."""
+    history = db.get_utility_dataframe(limit=size, tenant=TENANT)[
+        ['timestamp', 'water_gallons', 'electricity_kwh', 'gas_cubic_m']
+    ].to_dict('records')
+    eco_ai = EcoAI()
+    eco_ai.train_models(db.get_utility_columns(tenant=TENANT), TENANT)
+    material_ai = MaterialAI()
+    current = {'timestamp': datetime.datetime.now(), 'water_gallons': 5000.0, 'electricity_kwh': 500.0, 'gas_cubic_m': 100.0}
+    catalog = list(MATERIALS_DATABASE)
+
+    def smart_assistant_cold():
+        smart_assistant_cache.clear()
+        return core.smart_assistant(catalog[0])
+
+    return [
+        ("database.get_utility_history", lambda: db.get_utility_history(limit=50, tenant=TENANT)),
+        ("database.get_popular_materials", lambda: db.get_popular_materials(5)),
+        ("EcoAI.assess_usage", lambda: eco_ai.assess_usage(5000.0, 500.0, 100.0, history)),
+        ("EcoAI.predict_usage", lambda: eco_ai.predict_usage(current, TENANT)),
+        ("EcoAI.analyze_usage_patterns", lambda: eco_ai.analyze_usage_patterns(history)),
+        ("MaterialAI.analyze_material", lambda: material_ai.analyze_material(catalog[0])),
+        ("core.smart_assistant[cached]", lambda: core.smart_assistant(catalog[0])),
+        ("core.smart_assistant[cold]", smart_assistant_cold),
+        ("core.get_fallback_material_data[exact]", lambda: core.get_fallback_material_data(catalog[0])),
+        ("core.suggest_materials[fuzzy]", lambda: core.suggest_materials("plastik bottel")),
+        ("core.get_fallback_material_data[miss]", lambda: core.get_fallback_material_data("quantum foam")),
+        # Last, as it grows the store
+        ("database.save_utility_usage", lambda: db.save_utility_usage(5000.0, 500.0, 100.0, "Normal", "Normal", "Normal", TENANT)),
+    ]
+
+
+def measure(fn, rounds, min_time):
+    """Per-call seconds for each of ``rounds`` rounds, each at least ``min_time`` long."""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / 10:
+            number = max(1, int(number * min_time / elapsed))
+            break
+        number *= 10
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for _ in range(number):
+                fn()
+            timings.append((time.perf_counter() - started) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return number, timings
+
+
+def environment(args):
+    try:
+        revision = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        revision = ""
+    import pandas as pd
+
+    return {
+        "started": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "git_revision": revision or None,
+        "store": args.store,
+        "seed": args.seed,
+        "rounds": args.rounds,
+        "min_time": args.min_time,
+    }
+
+
+def compare(results, baseline_path, threshold, store):
+    """Print cases slower than the baseline's median by more than ``threshold``; returns how many."""
+    with open(baseline_path) as f:
+        previous_run = json.load(f)
+    if previous_run["environment"]["store"] != store:
+        print(f"note: {baseline_path} was run against the {previous_run['environment']['store']} store")
+    baseline = {(row["case"], row["size"]): row for row in previous_run["results"]}
+    regressions = 0
+    for row in results:
+        previous = baseline.get((row["case"], row["size"]))
+        if previous is None:
+            continue
+        change = row["median_s"] / previous["median_s"] - 1
+        if change > threshold:
+            regressions += 1
+            print(f"REGRESSION {row['case']} @ {row['size']}: "
+                  f"{previous['median_s'] * 1e6:.2f} us -> {row['median_s'] * 1e6:.2f} us ({change:+.0%})")
+    print(f"{regressions} regression(s) beyond {threshold:.0%} against {baseline_path}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--store", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per round")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--case", action="append", help="only run cases whose name contains this (repeatable)")
+    parser.add_argument("--output", help="write JSON results here")
+    parser.add_argument("--compare", help="JSON results of an earlier run to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed median slowdown for --compare")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            location = ":memory:" if args.store == "memory" else os.path.join(directory, f"bench-{size}.db")
+            db.use_store(db.open_store(location))
+            smart_assistant_cache.clear()
+            populate(size, np.random.default_rng(args.seed))
+            for name, fn in cases(size):
+                if args.case and not any(part in name for part in args.case):
+                    continue
+                number, timings = measure(fn, args.rounds, args.min_time)
+                row = {
+                    "case": name, "size": size, "calls_per_round": number,
+                    "median_s": statistics.median(timings), "min_s": min(timings), "mean_s": statistics.fmean(timings),
+                }
+                results.append(row)
+                print(f"{name:<42} {size:>8} {row['median_s'] * 1e6:12.2f} us  (min {row['min_s'] * 1e6:.2f}, {number} calls x {args.rounds})")
+        db.use_store(db.MemoryStore())
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment(args), "results": results}, f, indent=2)
+        print(f"wrote {len(results)} results to {args.output}")
+    if args.compare and compare(results, args.compare, args.threshold, args.store):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Multi-threaded stress test for the database stores.
+
+Every writer thread saves utility records and bumps search counts on a shared
+set of materials. Afterwards the totals must match exactly; a lost update makes
+the script exit non-zero.
+
+    python benchmarks/stress_store.py --writers 64 --ops 2000
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("ECOAUDIT_DB", ":memory:")
+
+import database as db
+
+MATERIALS = ["plastic bottle", "glass jar", "battery", "tin can", "e-waste", "styrofoam", "tire", "cd"]
+
+
+def run(store, writers, ops):
+    # Seed the catalog so every writer hits the increment path
+    for name in MATERIALS:
+        store.save_material(name, "reuse", "recycle")
+
+    start_barrier = threading.Barrier(writers)
+
+    def writer(worker):
+        start_barrier.wait()
+        for i in range(ops):
+            store.save_material(MATERIALS[(worker + i) % len(MATERIALS)], "reuse", "recycle")
+            store.add_utility(db.Record(datetime.datetime.now(), i, i, i, "Normal", "Normal", "Normal"), f"household-{worker}")
+
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    store.flush()
+
+    expected_searches = len(MATERIALS) + writers * ops
+    searches = sum(store.find_material(name).search_count for name in MATERIALS)
+    records = sum(len(store.utility_columns(tenant)["timestamp"]) for tenant in store.tenants())
+    return {
+        "elapsed_s": elapsed,
+        "ops_per_s": 2 * writers * ops / elapsed,
+        "lost_searches": expected_searches - searches,
+        "lost_records": writers * ops - records,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=64)
+    parser.add_argument("--ops", type=int, default=2000)
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {
+            "memory": db.MemoryStore(),
+            "sqlite": db.SQLiteStore(os.path.join(tmp, "stress.db")),
+        }
+        for label, store in stores.items():
+            result = run(store, args.writers, args.ops)
+            store.close()
+            print(f"{label:>6}: {args.writers} writers x {args.ops} ops in {result['elapsed_s']:.2f}s "
+                  f"({result['ops_per_s']:,.0f} ops/s), lost searches={result['lost_searches']}, "
+                  f"lost records={result['lost_records']}")
+            failed = failed or result["lost_searches"] or result["lost_records"]
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
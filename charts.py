@@ -0,0 +1,155 @@
+"""Plotly figures for the app, memoised as JSON.
+
+Building a figure through plotly express costs tens of milliseconds, most of
+it spent validating layout and trace styling that is the same on every rerun.
+Each chart here builds that scaffolding once, then copies its trace styling
+and patches in only the data. Finished figures are cached as JSON, keyed by a
+hash of the chart kind, its options and its input data, so a rerun over
+unchanged data only decodes the cached JSON.
+"""
+import functools
+import hashlib
+import json
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.utils import PlotlyJSONEncoder
+
+import metrics
+from cache import LRUCache
+from simple_ai_models import USAGE_RANGES
+
+STATUS_COLORS = {'Low': 'orange', 'Normal': 'green', 'High': 'red'}
+
+figure_cache = LRUCache(maxsize=256, ttl=3600.0)
+chart_seconds = metrics.histogram("ecoaudit_chart_seconds", "Time to produce a chart figure, from cache or built.")
+
+
+def data_key(kind, *parts):
+    """Hash of a chart kind and its inputs: DataFrames are hashed by content, anything else by repr."""
+    digest = hashlib.blake2b(kind.encode(), digest_size=16)
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            digest.update(repr(list(part.columns)).encode())
+            digest.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+        else:
+            digest.update(repr(part).encode())
+    return digest.hexdigest()
+
+
+def _memoized(kind, build, *parts):
+    with metrics.timer(chart_seconds, kind=kind):
+        text = figure_cache.get_or_compute(data_key(kind, *parts), lambda: json.dumps(build(), cls=PlotlyJSONEncoder))
+        # The JSON came from a validated figure, so skip plotly's per-property validation on the way back
+        return go.Figure(json.loads(text), _validate=False)
+
+
+@functools.cache
+def _line_scaffold(x, y, title, labels, markers):
+    return px.line(pd.DataFrame({x: [], y: []}), x=x, y=y, title=title, labels=dict(labels), markers=markers).to_dict()
+
+
+def line_chart(df, x, y, title, labels=None, markers=False):
+    """Single line of ``df[y]`` against ``df[x]``, as px.line would draw it."""
+    labels = tuple(sorted((labels or {}).items()))
+
+    def build():
+        scaffold = _line_scaffold(x, y, title, labels, markers)
+        trace = {**scaffold["data"][0], "x": df[x].to_numpy(), "y": df[y].to_numpy()}
+        return {"data": [trace], "layout": scaffold["layout"]}
+
+    return _memoized("line", build, df[[x, y]], x, y, title, labels, markers)
+
+
+@functools.cache
+def _usage_bar_scaffold():
+    sample = pd.DataFrame({'Utility': list(STATUS_COLORS), 'Usage': [0.0] * 3, 'Status': list(STATUS_COLORS)})
+    fig = px.bar(
+        sample,
+        x='Utility',
+        y='Usage',
+        color='Status',
+        color_discrete_map=STATUS_COLORS,
+        title="Your Usage Compared to Normal Ranges"
+    )
+    # Normal range indicators as horizontal lines
+    water_min, water_max = USAGE_RANGES[0].tolist()
+    fig.add_hline(y=water_min, line_dash="dash", line_color="green", annotation_text="Water Min")
+    fig.add_hline(y=water_max, line_dash="dash", line_color="green", annotation_text="Water Max")
+    fig.update_layout(
+        xaxis_title="Utility Type",
+        yaxis_title="Usage Value (Note: Units differ)",
+        legend_title="Status"
+    )
+    figure = fig.to_dict()
+    return {trace["name"]: trace for trace in figure["data"]}, figure["layout"]
+
+
+def usage_bar_chart(df):
+    """Bar per utility coloured by status, with the normal water range marked."""
+    def build():
+        traces, layout = _usage_bar_scaffold()
+        data = []
+        # One trace per status, in order of first appearance like px.bar
+        for status in df['Status'].unique():
+            rows = df[df['Status'] == status]
+            data.append({**traces[status], "x": rows['Utility'].to_numpy(), "y": rows['Usage'].to_numpy()})
+        return {"data": data, "layout": layout}
+
+    return _memoized("usage_bar", build, df[['Utility', 'Usage', 'Status']])
+
+
+@functools.cache
+def _efficiency_gauge_scaffold():
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number+delta",
+        value = 0,
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': "Efficiency Score"},
+        delta = {'reference': 70},
+        gauge = {
+            'axis': {'range': [None, 100]},
+            'bar': {'color': "darkblue"},
+            'steps': [
+                {'range': [0, 50], 'color': "lightgray"},
+                {'range': [50, 70], 'color': "yellow"},
+                {'range': [70, 100], 'color': "green"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 90
+            }
+        }
+    ))
+    fig.update_layout(height=400)
+    return fig.to_dict()
+
+
+def efficiency_gauge(efficiency):
+    def build():
+        scaffold = _efficiency_gauge_scaffold()
+        return {"data": [{**scaffold["data"][0], "value": efficiency}], "layout": scaffold["layout"]}
+
+    return _memoized("efficiency_gauge", build, efficiency)
+
+
+def material_scatter(material_df):
+    """Searches against sustainability score for the popular materials."""
+    def build():
+        fig = px.scatter(
+            material_df,
+            x='Searches',
+            y='Sustainability Score',
+            size='Searches',
+            color='Impact Level',
+            hover_data=['Material', 'Category', 'Environmental Impact'],
+            title='Material Sustainability Analysis',
+            color_discrete_map={'Low': 'green', 'Medium': 'orange', 'High': 'red'}
+        )
+        fig.update_layout(height=500)
+        return fig.to_dict()
+
+    # Marker sizes are scaled to the largest value, so this chart is cached whole rather than patched
+    return _memoized("material_scatter", build, material_df)
@@ -0,0 +1,197 @@
+"""EcoAudit's assessment and material logic, importable without Streamlit.
+
+app.py renders these results and api.py serves them over HTTP. Functions that
+need a model take it as an argument so a caller can pin one registry version
+for a whole request; by default they use the registry's current one.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import database as db
+import materials
+import metrics
+from cache import smart_assistant_cache
+from model_registry import registry
+
+
+# AI-Enhanced Functions
+@metrics.timed
+def assess_usage_with_ai(water_gallons, electricity_kwh, gas_cubic_m, household=db.DEFAULT_TENANT, eco_ai=None):
+    """AI-powered utility usage assessment"""
+    if eco_ai is None:
+        eco_ai = registry.current()[1]
+    # Get historical data for personalized assessment
+    history_df = db.get_utility_dataframe(limit=50, tenant=household)
+    data_for_analysis = history_df[['timestamp', 'water_gallons', 'electricity_kwh', 'gas_cubic_m']].to_dict('records')
+
+    # Use AI-enhanced assessment
+    water_status, electricity_status, gas_status = eco_ai.assess_usage(
+        water_gallons, electricity_kwh, gas_cubic_m, data_for_analysis
+    )
+
+    # Get AI predictions and analysis
+    current_data = {
+        'timestamp': datetime.now(),
+        'water_gallons': water_gallons,
+        'electricity_kwh': electricity_kwh,
+        'gas_cubic_m': gas_cubic_m
+    }
+
+    ai_predictions = None
+    ai_recommendations = []
+    efficiency_score = 50
+
+    if eco_ai.is_trained:
+        try:
+            ai_predictions = eco_ai.predict_usage(current_data, household)
+            ai_recommendations = eco_ai.generate_recommendations(water_gallons, electricity_kwh, gas_cubic_m)
+            patterns = eco_ai.analyze_usage_patterns(data_for_analysis)
+            efficiency_score = patterns.get('efficiency_score', 50)
+        except:
+            pass
+
+    ai_analysis = {
+        'status': {
+            'water': water_status,
+            'electricity': electricity_status,
+            'gas': gas_status
+        },
+        'predictions': ai_predictions,
+        'recommendations': ai_recommendations,
+        'efficiency_score': efficiency_score
+    }
+
+    return water_status, electricity_status, gas_status, ai_analysis
+
+def assess_usage(water_gallons, electricity_kwh, gas_cubic_m, household=db.DEFAULT_TENANT):
+    """Compatibility function for existing code"""
+    water_status, electricity_status, gas_status, _ = assess_usage_with_ai(water_gallons, electricity_kwh, gas_cubic_m, household)
+    return water_status, electricity_status, gas_status
+
+def help_center():
+    help_content = [
+        "**Water Usage:** Normal range is 3000–12000 gallons per month. If it's below 3000, check for a leak.",
+        "**Electricity Usage:** Normal range is 300–800 kWh per month. If it's above 800, please get it checked by an electrician or there might be a fuse or a fire in a while.",
+        "**Gas Usage:** Normal range is 50–150 cubic meters per month. Below 50 may indicate a gas leak."
+    ]
+    return help_content
+
+@metrics.timed
+def smart_assistant(material):
+    """
+    AI-powered material analysis providing reuse and recycle tips for non-biodegradable materials.
+    Uses machine learning to analyze sustainability metrics and generate personalized recommendations.
+    """
+    material = material.lower()
+    # Results are shared across sessions until the material is saved again or expires
+    return dict(smart_assistant_cache.get_or_compute(material, lambda: _analyze_material(material)))
+
+def _analyze_material(material):
+    """Uncached body of smart_assistant for a lower-cased material name"""
+    # Get AI-powered material analysis
+    ai_analysis = registry.material_model.analyze_material(material)
+
+    # Get traditional database recommendations
+    material_data = db.find_material(material)
+
+    return _merge_material(material, ai_analysis, material_data, lambda: get_fallback_material_data(material))
+
+def _merge_material(material, ai_analysis, material_data, fallback):
+    """Combine the three lookups; ``fallback`` is the catalog tips or a callable producing them"""
+    # Combine AI analysis with database information
+    ai_analysis = ai_analysis or {}
+    result = {
+        'ai_sustainability_score': ai_analysis.get('sustainability_score'),
+        'environmental_impact': ai_analysis.get('environmental_impact'),
+        'recyclability_score': ai_analysis.get('recyclability'),
+        'material_category': ai_analysis.get('category'),
+        'reuse_tips': material_data.reuse_tip if material_data else None,
+        'recycle_tips': material_data.recycle_tip if material_data else None
+    }
+
+    # If no database entry exists, use comprehensive database
+    if not result['reuse_tips'] or not result['recycle_tips']:
+        fallback_data = fallback() if callable(fallback) else fallback
+        if fallback_data and isinstance(fallback_data, dict):
+            result['reuse_tips'] = fallback_data.get('reuse', f"Consider creative repurposing of {material} based on its material properties and durability.")
+            result['recycle_tips'] = fallback_data.get('recycle', f"Research local recycling options for {material} or contact waste management services for proper disposal guidance.")
+        else:
+            # Provide generic but useful tips
+            result['reuse_tips'] = f"Consider creative repurposing of {material} based on its material properties and durability."
+            result['recycle_tips'] = f"Research local recycling options for {material} or contact waste management services for proper disposal guidance."
+
+    return result
+
+# Seconds each stage of smart_assistant_async may take before its result is dropped
+MATERIAL_STAGE_TIMEOUTS = {'analysis': 0.5, 'database': 1.0, 'fallback': 0.5}
+
+# Lookup stages get their own threads so a batch is not throttled by the loop's default executor
+_lookup_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="material-lookup")
+_FAILED = object()
+
+async def _stage(name, function, material, timeouts):
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(loop.run_in_executor(_lookup_pool, function, material), timeouts.get(name, 1.0))
+    except Exception:
+        # A timed-out thread keeps running, but its result is ignored
+        return _FAILED
+
+@metrics.timed
+async def smart_assistant_async(material, timeouts=None):
+    """smart_assistant with the model, database and catalog lookups run concurrently.
+
+    Each stage runs in a worker thread under its own timeout from
+    MATERIAL_STAGE_TIMEOUTS, so a request takes as long as the slowest stage
+    rather than the sum of all three. A stage that fails or times out is left
+    out of the merge and named in the result's ``unavailable`` list; such
+    partial results are not cached.
+    """
+    material = material.lower()
+    cached = smart_assistant_cache.get(material)
+    if cached is not None:
+        return dict(cached)
+    timeouts = {**MATERIAL_STAGE_TIMEOUTS, **(timeouts or {})}
+    generation = smart_assistant_cache.generation()
+    stages = {
+        'analysis': registry.material_model.analyze_material,
+        'database': db.find_material,
+        'fallback': get_fallback_material_data,
+    }
+    results = dict(zip(stages, await asyncio.gather(
+        *(_stage(name, function, material, timeouts) for name, function in stages.items())
+    )))
+    unavailable = [name for name, value in results.items() if value is _FAILED]
+    results = {name: None if value is _FAILED else value for name, value in results.items()}
+    result = _merge_material(material, results['analysis'], results['database'], results['fallback'])
+    if unavailable:
+        result['unavailable'] = unavailable
+    else:
+        smart_assistant_cache.set(material, result, generation)
+    return dict(result)
+
+async def smart_assistant_batch(names, timeouts=None):
+    """smart_assistant_async for many materials at once; results are in input order."""
+    names = [name.lower() for name in names]
+    unique = list(dict.fromkeys(names))
+    results = dict(zip(unique, await asyncio.gather(*(smart_assistant_async(name, timeouts) for name in unique))))
+    return [dict(results[name]) for name in names]
+
+# Drop cached assistant results whenever the database entry for a material changes
+db.add_material_listener(smart_assistant_cache.invalidate)
+
+def get_fallback_material_data(material):
+    """Get fallback material data from comprehensive database"""
+    return materials.matcher.tips(material)
+
+def suggest_materials(material, limit=5):
+    """Spelling suggestions for a material neither the database nor the catalog recognises"""
+    material = material.lower()
+    if db.find_material(material) or materials.matcher.match(material):
+        return []
+    scores = {}
+    for name, score in materials.suggest(material, limit) + db.search_materials(material, limit):
+        if name != material and score > scores.get(name, 0):
+            scores[name] = score
+    return sorted(scores, key=scores.get, reverse=True)[:limit]
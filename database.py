@@ -1,6 +1,24 @@
+import atexit
+import contextlib
 import datetime
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+import metrics
+
+from materials import TrigramIndex
+
+STATUS_LABELS = ("Low", "Normal", "High")
+# Utility usage is partitioned by tenant (one household); this one holds data saved without a tenant
+DEFAULT_TENANT = "default"
+STATUS_CODES = {label: code for code, label in enumerate(STATUS_LABELS)}
 
 class Record:
+    __slots__ = ("timestamp", "water_gallons", "electricity_kwh", "gas_cubic_m", "water_status", "electricity_status", "gas_status")
+
     def __init__(self, timestamp, water_gallons, electricity_kwh, gas_cubic_m, water_status, electricity_status, gas_status):
         self.timestamp = timestamp
         self.water_gallons = water_gallons
@@ -17,23 +35,755 @@ class Material:
         self.recycle_tip = recycle_tip
         self.search_count = search_count
 
-utility_data = []
-material_data = {}
 
-def save_utility_usage(water, electricity, gas, water_status, electricity_status, gas_status):
-    utility_data.append(Record(datetime.datetime.now(), water, electricity, gas, water_status, electricity_status, gas_status))
+# Timestamps are naive local datetimes; they are stored as microseconds since a
+# naive epoch so they round-trip exactly and line up with pandas' datetime64[us].
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+def to_epoch_us(timestamp):
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+def from_epoch_us(value):
+    return _EPOCH + datetime.timedelta(microseconds=int(value))
+
+
+UTILITY_COLUMNS = {
+    "timestamp": np.int64,
+    "water_gallons": np.float64,
+    "electricity_kwh": np.float64,
+    "gas_cubic_m": np.float64,
+    "water_status": np.int8,
+    "electricity_status": np.int8,
+    "gas_status": np.int8,
+}
+
+def _record_row(record):
+    return (
+        to_epoch_us(record.timestamp), record.water_gallons, record.electricity_kwh, record.gas_cubic_m,
+        STATUS_CODES[record.water_status], STATUS_CODES[record.electricity_status], STATUS_CODES[record.gas_status],
+    )
+
+def _row_record(row):
+    return Record(
+        from_epoch_us(row[0]), float(row[1]), float(row[2]), float(row[3]),
+        STATUS_LABELS[row[4]], STATUS_LABELS[row[5]], STATUS_LABELS[row[6]],
+    )
+
+def columns_to_records(columns):
+    """Materialise ``Record`` objects from a dict of utility columns."""
+    return [_row_record(row) for row in zip(*(columns[name].tolist() for name in UTILITY_COLUMNS))]
+
+def columns_to_dataframe(columns):
+    """Build a DataFrame from utility columns: datetime timestamps and categorical statuses."""
+    import pandas as pd
+
+    data = {"timestamp": pd.to_datetime(columns["timestamp"], unit="us")}
+    for name in ("water_gallons", "electricity_kwh", "gas_cubic_m"):
+        data[name] = columns[name]
+    for name in ("water_status", "electricity_status", "gas_status"):
+        data[name] = pd.Categorical.from_codes(columns[name], categories=STATUS_LABELS)
+    return pd.DataFrame(data)
+
+
+class UtilityColumns:
+    """Append-only, growable NumPy columns holding utility readings oldest first."""
+
+    def __init__(self, capacity=1024):
+        self._size = 0
+        self._arrays = {name: np.empty(capacity, dtype=dtype) for name, dtype in UTILITY_COLUMNS.items()}
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        capacity = len(self._arrays["timestamp"])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, array in self._arrays.items():
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self._size] = array[:self._size]
+            self._arrays[name] = grown
+
+    def append(self, record):
+        row = _record_row(record)
+        if self._size and row[0] < self._arrays["timestamp"][self._size - 1]:
+            self.extend({name: np.array([value], dtype=dtype) for (name, dtype), value in zip(UTILITY_COLUMNS.items(), row)})
+            return
+        self._reserve(1)
+        for array, value in zip(self._arrays.values(), row):
+            array[self._size] = value
+        self._size += 1
+
+    def extend(self, columns):
+        """Add a batch of rows, keeping the store ordered by timestamp.
+
+        A batch that starts at or after the newest row is appended in place.
+        Otherwise the merged columns are written to new arrays, so views handed
+        out earlier keep their contents.
+        """
+        order = np.argsort(columns["timestamp"], kind="stable")
+        batch = {name: np.asarray(columns[name], dtype=dtype)[order] for name, dtype in UTILITY_COLUMNS.items()}
+        n = len(order)
+        if not n:
+            return
+        if not self._size or batch["timestamp"][0] >= self._arrays["timestamp"][self._size - 1]:
+            self._reserve(n)
+            for name, array in self._arrays.items():
+                array[self._size:self._size + n] = batch[name]
+            self._size += n
+            return
+        merged = {name: np.concatenate([array[:self._size], batch[name]]) for name, array in self._arrays.items()}
+        order = np.argsort(merged["timestamp"], kind="stable")
+        size = self._size + n
+        capacity = max(len(self._arrays["timestamp"]), size)
+        for name, column in merged.items():
+            array = np.empty(capacity, dtype=column.dtype)
+            array[:size] = column[order]
+            self._arrays[name] = array
+        self._size = size
+
+    def view(self, limit=None):
+        """Zero-copy, read-only views of the last ``limit`` rows (all rows if None)."""
+        start = 0 if limit is None else max(self._size - limit, 0)
+        return self._slice(start, self._size)
+
+    def _slice(self, start, stop, step=1):
+        views = {}
+        for name, array in self._arrays.items():
+            view = array[start:stop][::step]
+            view.flags.writeable = False
+            views[name] = view
+        return views
+
+    def page(self, start_us=None, end_us=None, limit=50, cursor=None, newest_first=True):
+        """One page of rows with ``start_us <= timestamp < end_us`` and the cursor for the next page.
+
+        Bounds are found by binary search over the timestamp column and the page
+        is a zero-copy view. A cursor is ``(timestamp, k)`` naming the k-th row
+        with that timestamp, which stays valid as later rows are merged in.
+        """
+        timestamps = self._arrays["timestamp"][:self._size]
+        lo = 0 if start_us is None else int(np.searchsorted(timestamps, start_us))
+        hi = self._size if end_us is None else int(np.searchsorted(timestamps, end_us))
+        if newest_first:
+            if cursor is not None:
+                hi = min(hi, int(np.searchsorted(timestamps, cursor[0])) + cursor[1])
+            first = max(lo, hi - limit)
+            page = self._slice(first, hi, -1) if hi > first else self._slice(first, first)
+            more = first > lo
+            last = first
+        else:
+            if cursor is not None:
+                lo = max(lo, int(np.searchsorted(timestamps, cursor[0])) + cursor[1] + 1)
+            stop = max(lo, min(hi, lo + limit))
+            page = self._slice(lo, stop)
+            more = stop < hi
+            last = stop - 1
+        if not more:
+            return page, None
+        timestamp = int(timestamps[last])
+        return page, (timestamp, last - int(np.searchsorted(timestamps, timestamp)))
+
+
+class PopularityIndex:
+    """Materials ranked by search count, highest first, kept in order as counts change.
+
+    Counts only ever go up by one, so a bump swaps the material with the first
+    entry of its count group and moves that group's boundary: O(1) per update,
+    and the top k are just the first k entries. New materials enter at the
+    bottom with the lowest count.
+    """
+
+    def __init__(self):
+        self._ranked = []
+        self._position = {}
+        self._group_start = {}
+
+    def __len__(self):
+        return len(self._ranked)
+
+    def add(self, material):
+        index = len(self._ranked)
+        self._ranked.append(material)
+        self._position[material.name] = index
+        self._group_start.setdefault(material.search_count, index)
+
+    def bump(self, name):
+        i = self._position[name]
+        material = self._ranked[i]
+        count = material.search_count
+        j = self._group_start[count]
+        if i != j:
+            other = self._ranked[j]
+            self._ranked[i], self._ranked[j] = other, material
+            self._position[other.name] = i
+            self._position[name] = j
+        if j + 1 < len(self._ranked) and self._ranked[j + 1].search_count == count:
+            self._group_start[count] = j + 1
+        else:
+            del self._group_start[count]
+        material.search_count = count + 1
+        self._group_start.setdefault(count + 1, j)
+
+    def top(self, n):
+        return self._ranked[:n]
+
+
+# Stands in for tenants that have saved nothing yet
+_NO_UTILITY = UtilityColumns()
+_NO_LOCK = contextlib.nullcontext()
+
+
+class MemoryStore:
+    """Process-local storage. Nothing survives a restart; meant for tests and throwaway runs.
+
+    Safe to share between Streamlit session threads. Utility history is kept in
+    one UtilityColumns partition per tenant, each behind its own lock, so
+    households never wait on each other; the utility lock only guards adding
+    partitions. The catalog lock covers each
+    material's exists-or-create decision together with the popularity ranking
+    and name index, whose updates are O(1) per save.
+    """
+
+    def __init__(self):
+        self.utility_data = {}
+        self._partition_locks = {}
+        self.material_data = {}
+        self.popularity = PopularityIndex()
+        self.name_index = TrigramIndex()
+        self._utility_lock = threading.Lock()
+        self._catalog_lock = threading.Lock()
+
+    def _partition(self, tenant):
+        """``(lock, UtilityColumns)`` of ``tenant``, adding an empty partition if it has none."""
+        lock = self._partition_locks.get(tenant)
+        if lock is None:
+            with self._utility_lock:
+                if tenant not in self._partition_locks:
+                    self.utility_data[tenant] = UtilityColumns()
+                    self._partition_locks[tenant] = threading.Lock()
+                lock = self._partition_locks[tenant]
+        return lock, self.utility_data[tenant]
+
+    def _existing_partition(self, tenant):
+        # Reads of households without a partition see an empty one rather than creating it
+        lock = self._partition_locks.get(tenant)
+        if lock is None:
+            return _NO_LOCK, _NO_UTILITY
+        return lock, self.utility_data[tenant]
+
+    def add_utility(self, record, tenant):
+        lock, partition = self._partition(tenant)
+        with lock:
+            partition.append(record)
+
+    def add_utility_batch(self, columns, tenant):
+        lock, partition = self._partition(tenant)
+        with lock:
+            partition.extend(columns)
+
+    def utility_columns(self, tenant, limit=None):
+        lock, partition = self._existing_partition(tenant)
+        with lock:
+            return partition.view(limit)
+
+    def utility_page(self, tenant, start_us, end_us, limit, cursor, newest_first):
+        lock, partition = self._existing_partition(tenant)
+        with lock:
+            return partition.page(start_us, end_us, limit, cursor, newest_first)
+
+    def count_utility(self, tenant):
+        return len(self.utility_data.get(tenant, _NO_UTILITY))
+
+    def tenants(self):
+        with self._utility_lock:
+            return list(self.utility_data)
+
+    def poll(self):
+        # Nothing outside this process can write to it
+        return [], []
+
+    def utility_mark(self):
+        # Rows have no ids and do not outlive the process
+        return None
+
+    def utility_since(self, mark):
+        return []
+
+    def utility_snapshot(self, tenants=None):
+        return [], [], {tenant: self.utility_columns(tenant) for tenant in (self.tenants() if tenants is None else tenants)}
+
+    def save_material(self, name, reuse_tip, recycle_tip):
+        with self._catalog_lock:
+            if name in self.material_data:
+                self.popularity.bump(name)
+            else:
+                material = Material(name, reuse_tip, recycle_tip, 1)
+                self.material_data[name] = material
+                self.popularity.add(material)
+                self.name_index.add(name)
+
+    def find_material(self, name):
+        return self.material_data.get(name, None)
+
+    def popular_materials(self, n):
+        with self._catalog_lock:
+            return self.popularity.top(n)
+
+    def search_materials(self, query, limit):
+        with self._catalog_lock:
+            return self.name_index.search(query, limit)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
 
-def get_utility_history(limit=10):
-    return utility_data[-limit:]
+
+class SQLiteStore:
+    """SQLite storage in WAL mode with batched commits.
+
+    Writes are grouped into one transaction and committed every ``batch_size``
+    writes or, from a timer, ``commit_interval`` seconds after the first
+    uncommitted one, whichever comes first, so the SQLite write lock other
+    processes wait on (up to ``busy_timeout`` seconds) is never held longer.
+    A crash loses at most that window of writes. Reads go through
+    the same connection, so they always see pending writes. Per-tenant row
+    counts live in their own table, updated in the same transaction as the
+    rows, so every process sharing the file sees the same counts.
+
+    ``poll`` reports rows and materials other processes have committed since
+    the last call, for caches built on top of the store (see sync()).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS utility_usage (
+            id INTEGER PRIMARY KEY,
+            tenant TEXT NOT NULL DEFAULT 'default',
+            timestamp INTEGER NOT NULL,
+            water_gallons REAL NOT NULL,
+            electricity_kwh REAL NOT NULL,
+            gas_cubic_m REAL NOT NULL,
+            water_status INTEGER NOT NULL,
+            electricity_status INTEGER NOT NULL,
+            gas_status INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS materials (
+            name TEXT PRIMARY KEY,
+            reuse_tip TEXT NOT NULL,
+            recycle_tip TEXT NOT NULL,
+            search_count INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_materials_search_count ON materials (search_count);
+    """
+
+    def __init__(self, path, batch_size=100, commit_interval=1.0, busy_timeout=10.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._commit_timer = None
+        self.conn = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self._migrate()
+        self.conn.commit()
+        self.name_index = TrigramIndex(name for (name,) in self.conn.execute("SELECT name FROM materials"))
+        # What poll has already accounted for: other connections' commits, utility ids and material rowids
+        self._data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        self._synced_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM utility_usage").fetchone()[0]
+        self._synced_material = self.conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM materials").fetchone()[0]
+        # (first, last) id ranges this connection inserted since, which poll must not report back
+        self._own_rows = []
+
+    def _migrate(self):
+        # Processes opening the same file migrate one at a time
+        self.conn.execute("BEGIN IMMEDIATE")
+        # Databases from before tenants existed hold a single household's readings
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(utility_usage)")]
+        if "tenant" not in columns:
+            self.conn.execute(f"ALTER TABLE utility_usage ADD COLUMN tenant TEXT NOT NULL DEFAULT '{DEFAULT_TENANT}'")
+        self.conn.execute("DROP INDEX IF EXISTS idx_utility_usage_timestamp")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_utility_usage_tenant_timestamp ON utility_usage (tenant, timestamp)")
+        if not self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'utility_counts'").fetchone():
+            self.conn.execute("CREATE TABLE utility_counts (tenant TEXT PRIMARY KEY, count INTEGER NOT NULL)")
+            self.conn.execute("INSERT INTO utility_counts SELECT tenant, COUNT(*) FROM utility_usage GROUP BY tenant")
+
+    def _count_rows(self, tenant, rows):
+        self.conn.execute(
+            "INSERT INTO utility_counts (tenant, count) VALUES (?, ?) "
+            "ON CONFLICT (tenant) DO UPDATE SET count = count + excluded.count",
+            (tenant, rows),
+        )
+
+    def _wrote(self):
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self._commit()
+        elif self._commit_timer is None:
+            self._commit_timer = threading.Timer(self.commit_interval, self.flush)
+            self._commit_timer.daemon = True
+            self._commit_timer.start()
+
+    def _commit(self):
+        self.conn.commit()
+        self._pending = 0
+        if self._commit_timer is not None:
+            self._commit_timer.cancel()
+            self._commit_timer = None
+
+    def add_utility(self, record, tenant):
+        with self._lock:
+            row_id = self.conn.execute(
+                "INSERT INTO utility_usage (tenant, timestamp, water_gallons, electricity_kwh, gas_cubic_m, "
+                "water_status, electricity_status, gas_status) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (tenant, *_record_row(record)),
+            ).lastrowid
+            self._own_rows.append((row_id, row_id))
+            self._count_rows(tenant, 1)
+            self._wrote()
+
+    def add_utility_batch(self, columns, tenant):
+        rows = list(zip(*(np.asarray(columns[name], dtype=dtype).tolist() for name, dtype in UTILITY_COLUMNS.items())))
+        with self._lock:
+            self.conn.executemany(
+                f"INSERT INTO utility_usage (tenant, {', '.join(UTILITY_COLUMNS)}) "
+                f"VALUES (?, {', '.join('?' * len(UTILITY_COLUMNS))})",
+                ((tenant, *row) for row in rows),
+            )
+            if rows:
+                # The transaction holds the write lock, so the batch got consecutive ids
+                last = self.conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                self._own_rows.append((last - len(rows) + 1, last))
+            self._count_rows(tenant, len(rows))
+            self._commit()
+
+    @staticmethod
+    def _columns(rows, offset=0):
+        return {
+            name: np.fromiter((row[i + offset] for row in rows), dtype=dtype, count=len(rows))
+            for i, (name, dtype) in enumerate(UTILITY_COLUMNS.items())
+        }
+
+    def utility_columns(self, tenant, limit=None):
+        with self._lock:
+            return self._utility_columns(tenant, limit)
+
+    def _utility_columns(self, tenant, limit=None):
+        rows = self.conn.execute(
+            f"SELECT {', '.join(UTILITY_COLUMNS)} FROM utility_usage WHERE tenant = ? "
+            "ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (tenant, -1 if limit is None else limit),
+        ).fetchall()
+        rows.reverse()
+        return self._columns(rows)
+
+    def utility_page(self, tenant, start_us, end_us, limit, cursor, newest_first):
+        # Keyset pagination on (timestamp, id), served by the (tenant, timestamp) index
+        conditions, params = ["tenant = ?"], [tenant]
+        if start_us is not None:
+            conditions.append("timestamp >= ?")
+            params.append(start_us)
+        if end_us is not None:
+            conditions.append("timestamp < ?")
+            params.append(end_us)
+        if cursor is not None:
+            conditions.append("(timestamp, id) < (?, ?)" if newest_first else "(timestamp, id) > (?, ?)")
+            params.extend(cursor)
+        direction = "DESC" if newest_first else "ASC"
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT id, {', '.join(UTILITY_COLUMNS)} FROM utility_usage WHERE {' AND '.join(conditions)} "
+                f"ORDER BY timestamp {direction}, id {direction} LIMIT ?",
+                (*params, limit + 1),
+            ).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return self._columns(rows, offset=1), ((rows[-1][1], rows[-1][0]) if more else None)
+
+    def count_utility(self, tenant):
+        with self._lock:
+            row = self.conn.execute("SELECT count FROM utility_counts WHERE tenant = ?", (tenant,)).fetchone()
+        return row[0] if row else 0
+
+    def tenants(self):
+        with self._lock:
+            return self._tenants()
+
+    def _tenants(self):
+        return [tenant for (tenant,) in self.conn.execute("SELECT tenant FROM utility_counts")]
+
+    def poll(self):
+        """``(batches, names)`` committed by other processes since the last call.
+
+        ``batches`` holds ``(tenant, columns)`` of new utility rows and
+        ``names`` the materials added since, which also join ``name_index``.
+        PRAGMA data_version only changes when another connection commits, so
+        when nothing did this costs one pragma.
+        """
+        with self._lock:
+            version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._data_version:
+                self._data_version = version
+                return self._poll()
+            # Everything past the synced id is this connection's own
+            if self._own_rows:
+                self._synced_id = self._own_rows[-1][1]
+                self._own_rows = []
+            return [], []
+
+    def _poll(self):
+        rows = self.conn.execute(
+            f"SELECT id, tenant, {', '.join(UTILITY_COLUMNS)} FROM utility_usage WHERE id > ? ORDER BY id",
+            (self._synced_id,),
+        ).fetchall()
+        if rows:
+            self._synced_id = rows[-1][0]
+        if self._own_rows and rows:
+            ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+            first, last = (np.array(bound, dtype=np.int64) for bound in zip(*self._own_rows))
+            owner = np.searchsorted(first, ids, side="right") - 1
+            own = (owner >= 0) & (ids <= last[np.maximum(owner, 0)])
+            rows = [row for row, mine in zip(rows, own.tolist()) if not mine]
+        self._own_rows = []
+        batches = self._batches(rows)
+
+        materials = self.conn.execute(
+            "SELECT rowid, name FROM materials WHERE rowid > ? ORDER BY rowid", (self._synced_material,)
+        ).fetchall()
+        if materials:
+            self._synced_material = materials[-1][0]
+        names = [name for _, name in materials]
+        for name in names:
+            self.name_index.add(name)
+        return batches, names
+
+    def _batches(self, rows):
+        # (id, tenant, *UTILITY_COLUMNS) rows to (tenant, columns) pairs
+        by_tenant = {}
+        for row in rows:
+            by_tenant.setdefault(row[1], []).append(row)
+        return [(tenant, self._columns(tenant_rows, offset=2)) for tenant, tenant_rows in by_tenant.items()]
+
+    def utility_mark(self):
+        """Highest utility row id poll has accounted for: every row up to it has reached the listeners."""
+        with self._lock:
+            return self._synced_id
+
+    def utility_since(self, mark):
+        """``(tenant, columns)`` of the rows after ``mark`` up to utility_mark(), in id order per tenant."""
+        with self._lock:
+            return self._batches(self.conn.execute(
+                f"SELECT id, tenant, {', '.join(UTILITY_COLUMNS)} FROM utility_usage WHERE id > ? AND id <= ? ORDER BY id",
+                (mark, self._synced_id),
+            ).fetchall())
+
+    def utility_snapshot(self, tenants=None):
+        """poll() plus every tenant's (or just ``tenants``') full history, read together in one transaction."""
+        with self._lock:
+            began = not self.conn.in_transaction
+            if began:
+                self.conn.execute("BEGIN")
+            try:
+                self._data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+                batches, names = self._poll()
+                tenants = self._tenants() if tenants is None else tenants
+                partitions = {tenant: self._utility_columns(tenant) for tenant in tenants}
+            finally:
+                if began:
+                    self.conn.commit()
+        return batches, names, partitions
+
+    def save_material(self, name, reuse_tip, recycle_tip):
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO materials (name, reuse_tip, recycle_tip, search_count) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (name) DO UPDATE SET search_count = search_count + 1",
+                (name, reuse_tip, recycle_tip),
+            )
+            self.name_index.add(name)
+            self._wrote()
+
+    def find_material(self, name):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT name, reuse_tip, recycle_tip, search_count FROM materials WHERE name = ?", (name,)
+            ).fetchone()
+        return Material(*row) if row else None
+
+    def popular_materials(self, n):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT name, reuse_tip, recycle_tip, search_count FROM materials ORDER BY search_count DESC LIMIT ?",
+                (n,),
+            ).fetchall()
+        return [Material(*row) for row in rows]
+
+    def search_materials(self, query, limit):
+        with self._lock:
+            return self.name_index.search(query, limit)
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                self._commit()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def open_store(location):
+    """Open the backend for ``location``: ``":memory:"`` for a MemoryStore, otherwise a SQLite file path."""
+    if location == ":memory:":
+        return MemoryStore()
+    return SQLiteStore(location)
+
+store = open_store(os.environ.get("ECOAUDIT_DB", "ecoaudit.db"))
+atexit.register(lambda: store.flush())
+
+# Callbacks run with the lower-cased name after every save_material
+material_listeners = []
+
+def add_material_listener(callback):
+    """Register ``callback(name)`` to run after a material is saved. Registering twice is a no-op."""
+    if callback not in material_listeners:
+        material_listeners.append(callback)
+
+# Callbacks run with a dict of utility columns (see UTILITY_COLUMNS) and the tenant for every
+# batch written. They run under write_lock, so holding it gives a view of the store no listener has missed.
+utility_listeners = []
+write_lock = threading.RLock()
+
+def add_utility_listener(callback):
+    """Register ``callback(columns, tenant)`` to run after utility records are saved. Registering twice is a no-op."""
+    if callback not in utility_listeners:
+        utility_listeners.append(callback)
+
+def use_store(new_store):
+    """Swap the active backend, flushing the previous one."""
+    global store
+    store.flush()
+    store = new_store
+    return store
+
+def save_utility_usage(water, electricity, gas, water_status, electricity_status, gas_status, tenant=DEFAULT_TENANT):
+    record = Record(datetime.datetime.now(), water, electricity, gas, water_status, electricity_status, gas_status)
+    with write_lock:
+        store.add_utility(record, tenant)
+        if utility_listeners:
+            columns = {name: np.array([value], dtype=dtype)
+                       for (name, dtype), value in zip(UTILITY_COLUMNS.items(), _record_row(record))}
+            for callback in utility_listeners:
+                callback(columns, tenant)
+
+def save_utility_batch(columns, tenant=DEFAULT_TENANT):
+    """Save many readings at once from a dict of columns keyed like UTILITY_COLUMNS."""
+    with write_lock:
+        store.add_utility_batch(columns, tenant)
+        for callback in utility_listeners:
+            callback(columns, tenant)
+
+def _deliver(batches, names):
+    for tenant, columns in batches:
+        for callback in utility_listeners:
+            callback(columns, tenant)
+    for name in names:
+        for callback in material_listeners:
+            callback(name)
+
+def sync():
+    """Pass on what other processes sharing the database committed since the last call.
+
+    Their utility rows go to utility_listeners and their new materials to
+    material_listeners, as if they had been saved here, so the rollups, the
+    model registry and the lookup cache of every process (app and API alike)
+    follow all writes. Call it before serving each rerun or request. It is
+    skipped while this process is writing; the next call catches up.
+    """
+    if not write_lock.acquire(blocking=False):
+        return
+    try:
+        _deliver(*store.poll())
+    finally:
+        write_lock.release()
+
+def get_all_utility_columns(tenants=None):
+    """Every tenant's (or just ``tenants``') full history as ``{tenant: columns}``, for building a cache that then follows the listeners.
+
+    Other processes' writes are delivered in the same read, so each row is
+    either in the result or passed to listeners later, never both. Hold
+    write_lock across this and registering the listener.
+    """
+    with write_lock:
+        batches, names, partitions = store.utility_snapshot(tenants)
+        _deliver(batches, names)
+        return partitions
+
+def get_utility_mark():
+    """The store's utility high-water mark (None for stores without one), for get_utility_since().
+
+    Call it under write_lock right after sync(): every row up to the mark has
+    then been passed to the listeners, and none after it.
+    """
+    return store.utility_mark()
+
+def get_utility_since(mark):
+    """``(tenant, columns)`` of the rows saved after get_utility_mark() returned ``mark``, up to the current mark."""
+    return store.utility_since(mark)
+
+def get_tenants():
+    """Every tenant that has saved utility usage."""
+    return store.tenants()
+
+def get_utility_history(limit=10, tenant=DEFAULT_TENANT):
+    return columns_to_records(store.utility_columns(tenant, limit))
+
+def count_utility_records(tenant=DEFAULT_TENANT):
+    return store.count_utility(tenant)
+
+def query_utility_history(start=None, end=None, limit=50, cursor=None, newest_first=True, tenant=DEFAULT_TENANT):
+    """One page of utility history as ``(columns, next_cursor)``.
+
+    ``start`` (inclusive) and ``end`` (exclusive) are datetimes bounding the
+    page; pass the returned cursor back to get the following page, and stop
+    when it is None. Cursors are opaque strings tied to the store that made them;
+    a malformed one raises ValueError.
+    """
+    start_us = None if start is None else to_epoch_us(start)
+    end_us = None if end is None else to_epoch_us(end)
+    if cursor is not None:
+        timestamp, offset = (int(part) for part in cursor.split(":"))
+        cursor = (timestamp, offset)
+    columns, next_cursor = store.utility_page(tenant, start_us, end_us, limit, cursor, newest_first)
+    return columns, None if next_cursor is None else f"{next_cursor[0]}:{next_cursor[1]}"
+
+def get_utility_columns(limit=None, tenant=DEFAULT_TENANT):
+    """Utility history as a dict of NumPy columns, oldest first (zero-copy for the in-memory store)."""
+    return store.utility_columns(tenant, limit)
+
+def get_utility_dataframe(limit=10, tenant=DEFAULT_TENANT):
+    return columns_to_dataframe(store.utility_columns(tenant, limit))
 
 def save_material(name, reuse_tip, recycle_tip):
-    if name in material_data:
-        material_data[name].search_count += 1
-    else:
-        material_data[name] = Material(name, reuse_tip, recycle_tip, 1)
+    store.save_material(name, reuse_tip, recycle_tip)
+    for callback in material_listeners:
+        callback(name.lower())
 
 def find_material(name):
-    return material_data.get(name.lower(), None)
+    return store.find_material(name.lower())
 
+@metrics.timed
 def get_popular_materials(n=5):
-    return sorted(material_data.values(), key=lambda x: -x.search_count)[:n]
+    return store.popular_materials(n)
+
+def search_materials(name, limit=5):
+    """Saved materials whose names look like ``name``, as ``(name, score)`` pairs, best first."""
+    return store.search_materials(name.lower(), limit)
@@ -0,0 +1,201 @@
+"""Bulk ingestion of utility meter readings from CSV or JSONL.
+
+    python ingest.py readings.csv more-readings.jsonl --batch-size 10000
+
+Each row needs ``water_gallons``, ``electricity_kwh`` and ``gas_cubic_m``, and
+may carry an ISO 8601 ``timestamp`` (defaults to the time of import) and the
+``household`` it belongs to (defaults to ``--tenant``), so one file can hold
+many households, as workload.py writes them. Rows
+stream through parse -> validate -> batch -> assess -> write generators, so
+memory stays bounded by the batch size whatever the file size. Rejected rows
+are counted and the first few are kept with their line number and reason.
+"""
+import argparse
+import csv
+import datetime
+import io
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+import database as db
+
+USAGE_FIELDS = ("water_gallons", "electricity_kwh", "gas_cubic_m")
+
+
+class IngestReport:
+    def __init__(self, max_errors=100):
+        self.accepted = 0
+        self.rejected = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def reject(self, line, reason):
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line, reason))
+
+
+def read_rows(source, fmt):
+    """Yield ``(line_number, row)`` where row maps field names to raw values."""
+    if fmt == "jsonl":
+        for line_number, line in enumerate(source, start=1):
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line)
+                except ValueError:
+                    yield line_number, None
+        return
+    reader = csv.reader(source)
+    header = next(reader, None)
+    if header is None:
+        return
+    header = [name.strip() for name in header]
+    for line_number, values in enumerate(reader, start=2):
+        if values:
+            yield line_number, dict(zip(header, values))
+
+
+def parse_readings(rows, report, default_timestamp, default_tenant=None):
+    """Yield ``(line_number, tenant, timestamp_us, water, electricity, gas)``; unparseable rows are rejected.
+
+    ``tenant`` is the row's ``household``, or ``default_tenant`` when it has
+    none; with ``default_tenant`` None every row gets None.
+    """
+    default_us = db.to_epoch_us(default_timestamp)
+    for line_number, row in rows:
+        if not isinstance(row, dict):
+            report.reject(line_number, "not a JSON object")
+            continue
+        try:
+            water, electricity, gas = (float(row[field]) for field in USAGE_FIELDS)
+        except KeyError as e:
+            report.reject(line_number, f"missing {e.args[0]}")
+            continue
+        except (TypeError, ValueError):
+            report.reject(line_number, "usage values must be numbers")
+            continue
+        timestamp = row.get("timestamp")
+        if timestamp:
+            try:
+                timestamp = datetime.datetime.fromisoformat(timestamp)
+            except (TypeError, ValueError):
+                report.reject(line_number, f"bad timestamp {timestamp!r}")
+                continue
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.astimezone().replace(tzinfo=None)
+            timestamp_us = db.to_epoch_us(timestamp)
+        else:
+            timestamp_us = default_us
+        tenant = default_tenant
+        if default_tenant is not None:
+            tenant = str(row.get("household") or "").strip() or default_tenant
+        yield line_number, tenant, timestamp_us, water, electricity, gas
+
+
+def validate_readings(readings, report):
+    """Drop readings that are negative or not finite."""
+    for reading in readings:
+        if all(math.isfinite(value) and value >= 0 for value in reading[3:]):
+            yield reading
+        else:
+            report.reject(reading[0], "usage values must be finite and non-negative")
+
+
+def batch_readings(readings, batch_size):
+    """Yield ``(tenant, columns)``: each run of ``batch_size`` readings split by tenant into dicts of NumPy columns."""
+    batch = {}
+    size = 0
+    for reading in readings:
+        batch.setdefault(reading[1], []).append(reading[2:])
+        size += 1
+        if size >= batch_size:
+            yield from ((tenant, _columns(rows)) for tenant, rows in batch.items())
+            batch = {}
+            size = 0
+    yield from ((tenant, _columns(rows)) for tenant, rows in batch.items())
+
+
+def _columns(batch):
+    timestamps, water, electricity, gas = zip(*batch)
+    return {
+        "timestamp": np.array(timestamps, dtype=np.int64),
+        "water_gallons": np.array(water, dtype=np.float64),
+        "electricity_kwh": np.array(electricity, dtype=np.float64),
+        "gas_cubic_m": np.array(gas, dtype=np.float64),
+    }
+
+
+def assess_batches(batches, model):
+    """Add status columns to each ``(tenant, columns)`` batch with the model's vectorised assessment."""
+    for tenant, columns in batches:
+        codes = model.assess_usage_batch(columns)
+        columns["water_status"], columns["electricity_status"], columns["gas_status"] = codes.T
+        yield tenant, columns
+
+
+def ingest(source, fmt="csv", batch_size=10_000, model=None, write=db.save_utility_batch, report=None,
+           tenant=db.DEFAULT_TENANT, households=True):
+    """Stream readings from the text file object ``source`` into the store and return an IngestReport.
+
+    Rows go to their ``household`` column's history, or ``tenant``'s when they
+    have none; with ``households`` False every row goes to ``tenant``.
+    """
+    if model is None:
+        from model_registry import registry
+        model = registry.current()[1]
+    report = report or IngestReport()
+    rows = parse_readings(read_rows(source, fmt), report, datetime.datetime.now(), tenant if households else None)
+    readings = validate_readings(rows, report)
+    for batch_tenant, columns in assess_batches(batch_readings(readings, batch_size), model):
+        write(columns, batch_tenant or tenant)
+        report.accepted += len(columns["timestamp"])
+    return report
+
+
+def format_of(filename):
+    return "jsonl" if os.path.splitext(filename)[1].lower() in (".jsonl", ".ndjson") else "csv"
+
+
+def ingest_upload(uploaded_file, batch_size=10_000, tenant=db.DEFAULT_TENANT):
+    """Ingest a binary file-like upload (e.g. from st.file_uploader), picking the format from its name.
+
+    Every row goes to ``tenant``: a visitor's upload cannot write to other
+    households whatever its ``household`` column says.
+    """
+    with io.TextIOWrapper(uploaded_file, encoding="utf-8", newline="") as source:
+        return ingest(source, format_of(uploaded_file.name), batch_size, tenant=tenant, households=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load utility meter readings into the EcoAudit database.")
+    parser.add_argument("paths", nargs="+", help="CSV or JSONL files ('-' reads CSV from stdin)")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="override detection from the file extension")
+    parser.add_argument("--tenant", default=db.DEFAULT_TENANT, help="household for rows without a household column")
+    args = parser.parse_args(argv)
+
+    # The model follows the loaded readings and leaves a snapshot for the app and API
+    from model_registry import registry
+    registry.start()
+    failed = False
+    for path in args.paths:
+        fmt = args.format or format_of(path)
+        if path == "-":
+            report = ingest(sys.stdin, fmt, args.batch_size, tenant=args.tenant)
+        else:
+            with open(path, newline="", encoding="utf-8") as source:
+                report = ingest(source, fmt, args.batch_size, tenant=args.tenant)
+        print(f"{path}: {report.accepted} accepted, {report.rejected} rejected")
+        for line, reason in report.errors:
+            print(f"  line {line}: {reason}")
+        failed = failed or report.rejected
+    db.store.flush()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,488 @@
+"""Reuse and recycle tips for common non-biodegradable materials.
+
+The catalog is compiled once at import into a MaterialMatcher, so looking up a
+free-text material costs one pass over the query no matter how many materials
+the catalog holds. A TrigramIndex over the same keys backs typo-tolerant
+suggestions.
+"""
+import numpy as np
+
+# Comprehensive materials database with reuse and recycle tips
+MATERIALS_DATABASE = {
+    # Plastics
+    "plastic bag": {
+        "reuse": "Use as trash liners, storage bags, or packing material. Can also be fused together to make waterproof tarps or stronger reusable bags.",
+        "recycle": "Drop at plastic bag collection centers or participating grocery stores. Many retailers have front-of-store recycling bins."
+    },
+    "plastic bottle": {
+        "reuse": "Create bird feeders, planters, watering cans, piggy banks, or desk organizers. Can be cut to make funnels, scoops, or storage containers.",
+        "recycle": "Rinse thoroughly and recycle in curbside recycling if marked with recycling symbols 1 (PET) or 2 (HDPE)."
+    },
+    "plastic container": {
+        "reuse": "Use for food storage, organizing small items, seed starters, or craft projects. Durable containers can become drawer dividers or small tool boxes.",
+        "recycle": "Check the recycling number (1-7) on the bottom and recycle according to local guidelines. Thoroughly clean before recycling."
+    },
+    "plastic cup": {
+        "reuse": "Use for seed starters, craft organization, or small storage. Can be decorated and used as pen holders or small gift containers.",
+        "recycle": "Rinse and recycle #1 or #2 plastic cups. Many clear disposable cups are recyclable."
+    },
+    "plastic straw": {
+        "reuse": "Create craft projects, jewelry, or use for science experiments. Can be used for drainage in potted plants.",
+        "recycle": "Generally not recyclable in most curbside programs due to size. Consider switching to reusable alternatives."
+    },
+    "plastic toy": {
+        "reuse": "Donate to charity, schools, or daycare centers if in good condition. Can be repurposed into art projects.",
+        "recycle": "Hard plastic toys may be recyclable - check with local recycling facilities. Some toy companies have take-back programs."
+    },
+    "plastic lid": {
+        "reuse": "Use as coasters, for arts and crafts, or as paint mixing palettes. Can be used to catch drips under flowerpots.",
+        "recycle": "Many recycling programs accept plastic lids, but they should be separated from bottles/containers."
+    },
+    "plastic cover": {
+        "reuse": "Use as protective surfaces for painting projects, cutting boards for crafts, or drawer liners.",
+        "recycle": "Check recycling number and follow local guidelines. Many rigid plastic covers are recyclable."
+    },
+    "plastic wrap": {
+        "reuse": "Can be cleaned and reused for wrapping items or for art projects. Use as a protective covering for painting.",
+        "recycle": "Most cling wrap/plastic film is not recyclable in curbside programs but can be taken to store drop-off locations."
+    },
+    "polythene": {
+        "reuse": "Use as moisture barriers, protective coverings, or for storage. Heavy-duty sheeting can be used for drop cloths.",
+        "recycle": "Clean, dry polyethylene film can be recycled at store drop-off locations or special film recycling programs."
+    },
+    "bubble wrap": {
+        "reuse": "Reuse for packaging, insulation, or as a plant frost protector. Can be used for textured art projects or stress relief.",
+        "recycle": "Can be recycled with plastic film at grocery store drop-off locations, not in curbside recycling."
+    },
+    "ziploc bag": {
+        "reuse": "Wash and reuse for food storage, organizing small items, or traveling with toiletries. Can be used for marinating foods.",
+        "recycle": "Clean, dry Ziploc bags can be recycled with plastic film at store drop-off locations."
+    },
+    "styrofoam": {
+        "reuse": "Use as packaging material, craft projects, or to make garden seedling trays. Can be broken up and used for drainage in planters.",
+        "recycle": "Difficult to recycle in most areas. Some specialty recycling centers accept clean Styrofoam. Consider reducing usage."
+    },
+    "thermocol": {
+        "reuse": "Can be used for insulation, art projects, or floating devices. Good for organization of fragile items.",
+        "recycle": "Specialized facilities may accept clean thermocol. Contact local waste management for options."
+    },
+    "pvc": {
+        "reuse": "PVC pipes can be repurposed for garden supports, organization systems, or DIY furniture projects.",
+        "recycle": "PVC is difficult to recycle. Check with specialized recycling centers for options."
+    },
+    "acrylic": {
+        "reuse": "Can be cut and reused for picture frames, art displays, or small organization projects.",
+        "recycle": "Usually not accepted in curbside recycling. Some specialty recycling facilities may accept it."
+    },
+    "plastic packaging": {
+        "reuse": "Use for storage, organizing, or craft projects. Blister packaging can become small containers.",
+        "recycle": "Check with local recycling guidelines. Hard plastic packaging may be recyclable; soft film packaging usually needs store drop-off."
+    },
+    
+    # Electronics and E-waste
+    "e-waste": {
+        "reuse": "Consider donating working electronics. Parts can be salvaged for DIY projects or educational purposes.",
+        "recycle": "Take to certified e-waste recycling centers, retail take-back programs, or manufacturer recycling programs."
+    },
+    "battery": {
+        "reuse": "Rechargeable batteries can be recharged hundreds of times. Single-use batteries cannot be reused.",
+        "recycle": "Never throw in trash. Recycle at battery drop-off locations, electronic stores, or hazardous waste facilities."
+    },
+    "phone": {
+        "reuse": "Repurpose as music players, alarm clocks, webcams, or dedicated GPS devices. Donate working phones to charity programs.",
+        "recycle": "Return through manufacturer take-back programs or certified e-waste recyclers who will recover valuable materials."
+    },
+    "laptop": {
+        "reuse": "Older laptops can be repurposed as media centers, digital photo frames, or dedicated writing devices.",
+        "recycle": "Many manufacturers and electronics retailers offer recycling programs. Remove and securely erase data first."
+    },
+    "computer": {
+        "reuse": "Repurpose as a media server, donate to schools or nonprofits, or use parts for other systems.",
+        "recycle": "Take to certified e-waste recyclers, manufacturer take-back programs, or electronics retailers with recycling services."
+    },
+    "tablet": {
+        "reuse": "Repurpose as digital photo frames, kitchen recipe displays, home automation controllers, or security monitors.",
+        "recycle": "Recycle through manufacturer programs, electronics retailers, or certified e-waste recyclers."
+    },
+    "printer": {
+        "reuse": "Donate working printers to schools, nonprofits, or community centers. Parts can be salvaged for projects.",
+        "recycle": "Many electronics retailers and office supply stores offer printer recycling. Never dispose in regular trash."
+    },
+    "wire": {
+        "reuse": "Repurpose for craft projects, garden ties, or organization solutions. Quality cables can be kept as spares.",
+        "recycle": "Recycle with e-waste or at scrap metal facilities. Copper wiring has value for recycling."
+    },
+    "cable": {
+        "reuse": "Label and store useful cables for future use. Can be repurposed for organization or craft projects.",
+        "recycle": "E-waste recycling centers will accept cables and cords. Some retailers also offer cable recycling."
+    },
+    "headphone": {
+        "reuse": "Repair if possible, or use parts for other audio projects. Working headphones can be donated.",
+        "recycle": "Recycle with other e-waste at electronics recycling centers or through manufacturer programs."
+    },
+    "charger": {
+        "reuse": "Keep compatible chargers as backups. Universal chargers can be used for multiple devices.",
+        "recycle": "Recycle with e-waste at electronics recycling centers or through retailer programs."
+    },
+    
+    # Metals
+    "metal": {
+        "reuse": "Metal items can often be repurposed for craft projects, garden art, or functional household items.",
+        "recycle": "Most metals are highly recyclable and valuable. Clean and separate by type when possible."
+    },
+    "aluminum": {
+        "reuse": "Aluminum cans can be used for crafts, planters, or organizational tools. Aluminum foil can be cleaned and reused.",
+        "recycle": "One of the most recyclable materials. Clean and crush cans to save space. Foil should be cleaned first."
+    },
+    "aluminum can": {
+        "reuse": "Create candle holders, pencil cups, wind chimes, or other decorative items. Can be used for camping or craft stoves.",
+        "recycle": "Highly recyclable and can be recycled infinitely. Rinse clean and place in recycling bin."
+    },
+    "aluminum foil": {
+        "reuse": "Clean foil can be reused for cooking, food storage, or crafting. Can be molded into small containers or used as garden pest deterrents.",
+        "recycle": "Clean foil can be recycled. Roll into a ball to prevent it from blowing away in recycling facilities."
+    },
+    "tin can": {
+        "reuse": "Use for storage, planters, candle holders, or craft projects. Can be decorated and repurposed in many ways.",
+        "recycle": "Remove labels, rinse clean, and recycle with metal recycling. The metal is valuable and highly recyclable."
+    },
+    "steel": {
+        "reuse": "Small steel items can be repurposed or used for DIY projects. Steel containers can be reused for storage.",
+        "recycle": "Highly recyclable. Separate from other materials when possible and recycle with metals."
+    },
+    "iron": {
+        "reuse": "Iron pieces can be used for weights, doorstops, or decorative elements. Small pieces can be used in craft projects.",
+        "recycle": "Recyclable at scrap metal facilities. Separate from other metals when possible."
+    },
+    "copper": {
+        "reuse": "Small copper items or wiring can be used for art projects, garden features, or DIY electronics.",
+        "recycle": "Valuable for recycling. Take to scrap metal facilities or e-waste recycling centers."
+    },
+    "brass": {
+        "reuse": "Brass items can be cleaned, polished, and repurposed as decorative elements or functional hardware.",
+        "recycle": "Recyclable at scrap metal facilities. Keep separate from other metals for higher value."
+    },
+    "silver": {
+        "reuse": "Silver items can be cleaned, polished, and reused. Small amounts can be used in craft or jewelry projects.",
+        "recycle": "Valuable for recycling. Take to specialty recyclers or jewelers who may buy silver scrap."
+    },
+    
+    # Glass
+    "glass": {
+        "reuse": "Glass jars and bottles can be washed and reused for storage, craft projects, or serving containers.",
+        "recycle": "Highly recyclable but should be separated by color. Remove lids and rinse clean before recycling."
+    },
+    "glass jar": {
+        "reuse": "Perfect for food storage, organization, vases, candle holders, or terrarium projects.",
+        "recycle": "Remove lids, rinse thoroughly, and recycle. Glass can be recycled endlessly without loss of quality."
+    },
+    "glass bottle": {
+        "reuse": "Reuse as water bottles, vases, lamp bases, garden borders, or decorative items. Can be cut to make drinking glasses.",
+        "recycle": "Remove caps and rinse thoroughly. Sort by color if required by local recycling guidelines."
+    },
+    "light bulb": {
+        "reuse": "Incandescent bulbs can be repurposed as decorative items or craft projects. Do not reuse broken glass.",
+        "recycle": "Incandescent bulbs generally go in trash. CFLs and LEDs should be recycled at specialty locations due to components."
+    },
+    "mirror": {
+        "reuse": "Broken mirrors can be used for mosaic art. Intact mirrors can be reframed or repurposed as decorative items.",
+        "recycle": "Mirror glass is not recyclable with regular glass due to reflective coating. Donate usable mirrors."
+    },
+    "windshield": {
+        "reuse": "Salvaged auto glass can be repurposed for construction, art installations, or landscaping features.",
+        "recycle": "Auto glass is not recyclable in regular glass recycling. Specialized auto recyclers may accept it."
+    },
+    
+    # Rubber and Silicone
+    "rubber": {
+        "reuse": "Can be cut into gaskets, grip pads, or used for craft projects. Rubber strips can function as jar openers.",
+        "recycle": "Specialized rubber recycling programs exist. Check with tire retailers or rubber manufacturers."
+    },
+    "tire": {
+        "reuse": "Create garden planters, swings, outdoor furniture, or playground equipment. Can be used as exercise weights.",
+        "recycle": "Many tire retailers will accept old tires for recycling, usually for a small fee. Never burn tires."
+    },
+    "slipper": {
+        "reuse": "Old flip-flops can be used as kneeling pads, cleaning scrubbers, or craft projects. Donate usable footwear.",
+        "recycle": "Some athletic shoe companies have recycling programs for athletic shoes. Check TerraCycle for specialty programs."
+    },
+    "rubber band": {
+        "reuse": "Keep for organization, sealing containers, or craft projects. Can be used as grip enhancers or hair ties.",
+        "recycle": "Not recyclable in conventional systems. Reuse until worn out, then dispose in trash."
+    },
+    "silicone": {
+        "reuse": "Silicone kitchenware can be repurposed for organizational trays, pet feeding mats, or craft molds.",
+        "recycle": "Not recyclable in conventional systems. Some specialty programs through TerraCycle may exist."
+    },
+    
+    # Paper Products with Non-Biodegradable Elements
+    "tetra pack": {
+        "reuse": "Clean and dry for craft projects, seed starters, or storage containers. Can be used as small compost bins.",
+        "recycle": "Specialized recycling is required due to multiple material layers. Check if your area accepts carton recycling."
+    },
+    "juice box": {
+        "reuse": "Clean thoroughly and use for craft projects, small storage, or seed starters.",
+        "recycle": "Rinse and recycle through carton recycling programs where available."
+    },
+    "laminated paper": {
+        "reuse": "Reuse as durable labels, bookmarks, place mats, or educational materials.",
+        "recycle": "Generally not recyclable due to plastic coating. Reuse instead of recycling."
+    },
+    "waxed paper": {
+        "reuse": "Can be reused several times for food wrapping or as a non-stick surface for crafts.",
+        "recycle": "Not recyclable due to wax coating. Some versions may be compostable if made with natural wax."
+    },
+    "receipts": {
+        "reuse": "Use for note-taking or craft projects if not thermal paper.",
+        "recycle": "Thermal receipts (shiny paper) contain BPA and should not be recycled or composted. Regular paper receipts can be recycled."
+    },
+    
+    # Fabrics and Textiles
+    "synthetic": {
+        "reuse": "Repurpose for cleaning rags, craft projects, pet bedding, or stuffing for pillows.",
+        "recycle": "Some textile recycling programs accept synthetic fabrics. H&M and other retailers have fabric take-back programs."
+    },
+    "polyester": {
+        "reuse": "Cut into cleaning cloths, use for quilting projects, or repurpose into bags, pillowcases, or other items.",
+        "recycle": "Take to textile recycling programs. Some areas have curbside textile recycling."
+    },
+    "old clothes": {
+        "reuse": "Convert to cleaning rags, craft materials, or upcycle into new garments. Donate wearable clothes.",
+        "recycle": "Textile recycling programs accept worn-out clothes. Some retailers offer take-back programs."
+    },
+    "shirt": {
+        "reuse": "Turn into pillowcases, bags, quilts, or cleaning rags. T-shirts make great yarn for crochet projects.",
+        "recycle": "Donate wearable shirts to charity. Recycle unwearable shirts through textile recycling programs."
+    },
+    "nylon": {
+        "reuse": "Old nylon stockings can be used for gardening, straining, cleaning, or craft projects.",
+        "recycle": "Some specialty recycling programs accept nylon. Check with manufacturers like Patagonia or TerraCycle."
+    },
+    "carpet": {
+        "reuse": "Cut into rugs, door mats, or cat scratching posts. Use under furniture to prevent floor scratches.",
+        "recycle": "Some carpet manufacturers have take-back programs. Check with local carpet retailers."
+    },
+    
+    # Media and Data Storage
+    "cd": {
+        "reuse": "Create reflective decorations, coasters, art projects, or garden bird deterrents.",
+        "recycle": "Specialized e-waste recycling centers can process CDs and DVDs. Cannot go in curbside recycling."
+    },
+    "dvd": {
+        "reuse": "Use for decorative projects, mosaic art, reflective garden features, or craft projects.",
+        "recycle": "Take to electronics recycling centers. Best Buy and other retailers may accept them for recycling."
+    },
+    "video tape": {
+        "reuse": "The tape inside can be used for craft projects, binding materials, or decorative elements.",
+        "recycle": "Requires specialty e-waste recycling. GreenDisk and similar services accept media for recycling."
+    },
+    "cassette tape": {
+        "reuse": "Cases can be repurposed for small item storage. Tape can be used in art projects.",
+        "recycle": "Specialized e-waste recycling is required. Not accepted in curbside recycling."
+    },
+    "floppy disk": {
+        "reuse": "Repurpose as coasters, notebook covers, or decorative items. Can be disassembled for craft parts.",
+        "recycle": "Specialized e-waste recycling is required. Not accepted in regular recycling."
+    },
+    
+    # Composites and Multi-material Items
+    "shoes": {
+        "reuse": "Donate wearable shoes. Repurpose parts for crafts or garden projects.",
+        "recycle": "Nike's Reuse-A-Shoe program and similar initiatives recycle athletic shoes into playground surfaces."
+    },
+    "backpack": {
+        "reuse": "Repair and donate usable backpacks. Repurpose fabric, zippers, and straps for other projects.",
+        "recycle": "Some textile recycling programs may accept them. The North Face and similar programs take worn gear."
+    },
+    "umbrella": {
+        "reuse": "Fabric can be used for small waterproof projects. Frame can be used for garden supports or craft projects.",
+        "recycle": "Separate materials (metal frame and synthetic fabric) and recycle appropriately. Full umbrellas not recyclable."
+    },
+    "mattress": {
+        "reuse": "Foam can be repurposed for cushions or pet beds. Springs can be used for garden trellises.",
+        "recycle": "Specialized mattress recycling facilities can break down components. Many states have mattress recycling programs."
+    },
+    
+    # Miscellaneous
+    "blister pack": {
+        "reuse": "Small clear blister packs can be used for bead or craft supply storage, seed starting, or organizing small items.",
+        "recycle": "Generally not recyclable in curbside programs. TerraCycle has specialty programs for some types."
+    },
+    "paint can": {
+        "reuse": "Clean metal paint cans can be used for storage or organization. Use as planters with drainage holes.",
+        "recycle": "Metal paint cans can be recycled once completely empty and dry. Latex paint residue can be dried out."
+    },
+    "ceramic": {
+        "reuse": "Broken ceramics can be used for mosaic projects, drainage in planters, or garden decoration.",
+        "recycle": "Not recyclable in conventional recycling. Clean, usable items should be donated."
+    },
+    "fiberglass": {
+        "reuse": "Small fiberglass pieces can be used for insulation projects or DIY auto body repairs.",
+        "recycle": "Specialized recycling is required. Check with manufacturers or construction waste recyclers."
+    },
+    "composite wood": {
+        "reuse": "Repurpose for smaller projects, garden edging, or raised bed construction.",
+        "recycle": "Not recyclable in conventional systems due to adhesives and mixed materials. Reuse is preferred."
+    }
+}
+
+# Tips returned when nothing in the catalog matches
+DEFAULT_TIPS = (
+    "Try creative repurposing based on the material properties. Consider if it can be cut, shaped, or combined with other materials for new uses.",
+    "Research specialized recycling options for this material. Contact your local waste management authority or search Earth911.com for recycling locations."
+)
+
+
+class MaterialMatcher:
+    """Aho-Corasick automaton over catalog keys and the words inside them.
+
+    Precedence is the same as scanning the catalog in order: the first key that
+    occurs in the query wins; failing that, the first key with any of its words
+    occurring in the query. One scan of the query collects every pattern that
+    occurs, and the precomputed catalog ranks pick the winner.
+    """
+
+    def __init__(self, catalog):
+        self.keys = list(catalog)
+        self.catalog = catalog
+        patterns = {}
+        key_rank = {}
+        word_rank = {}
+        for rank, key in enumerate(self.keys):
+            key_rank.setdefault(patterns.setdefault(key, len(patterns)), rank)
+            for word in key.split():
+                word_rank.setdefault(patterns.setdefault(word, len(patterns)), rank)
+        self._key_rank = key_rank
+        self._word_rank = word_rank
+        self._build(patterns)
+
+    def _build(self, patterns):
+        goto = [{}]
+        output = [[]]
+        for pattern, pattern_id in patterns.items():
+            state = 0
+            for char in pattern:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][char] = nxt
+                    goto.append({})
+                    output.append([])
+                state = nxt
+            output[state].append(pattern_id)
+
+        # Breadth-first fail links; each state inherits the outputs of its fail state
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for char, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and char not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(char, 0) if state else 0
+                output[nxt] = output[nxt] + output[fail[nxt]]
+        self._goto = goto
+        self._fail = fail
+        self._output = [tuple(ids) for ids in output]
+
+    def match(self, material):
+        """Return the catalog key matching ``material``, or None."""
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in material:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        if not found:
+            return None
+        key_ranks = [self._key_rank[i] for i in found if i in self._key_rank]
+        if key_ranks:
+            return self.keys[min(key_ranks)]
+        word_ranks = [self._word_rank[i] for i in found if i in self._word_rank]
+        if word_ranks:
+            return self.keys[min(word_ranks)]
+        return None
+
+    def tips(self, material):
+        """Return ``(reuse, recycle)`` tips for ``material``, falling back to DEFAULT_TIPS."""
+        key = self.match(material)
+        if key is None:
+            return DEFAULT_TIPS
+        tips = self.catalog[key]
+        return tips["reuse"], tips["recycle"]
+
+
+def trigrams(text):
+    """Character trigrams of ``text`` padded so word starts and ends count."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Inverted index from character trigrams to names, for fuzzy lookups.
+
+    A query counts shared trigrams for every name at once with ``np.bincount``
+    over the posting arrays of its trigrams, then scores by Dice similarity.
+    Posting arrays are materialised lazily and rebuilt only for trigrams of
+    newly added names.
+    """
+
+    def __init__(self, names=()):
+        self._names = []
+        self._sizes = []
+        self._ids = {}
+        self._postings = {}
+        self._posting_arrays = {}
+        self._size_array = np.zeros(0, dtype=np.float64)
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, name):
+        if name in self._ids:
+            return
+        name_id = len(self._names)
+        grams = trigrams(name)
+        self._ids[name] = name_id
+        self._names.append(name)
+        self._sizes.append(len(grams))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(name_id)
+            self._posting_arrays.pop(gram, None)
+
+    def _posting_array(self, gram):
+        array = self._posting_arrays.get(gram)
+        if array is None:
+            array = self._posting_arrays[gram] = np.array(self._postings[gram], dtype=np.int32)
+        return array
+
+    def search(self, query, limit=5, min_score=0.4):
+        """Return up to ``limit`` ``(name, score)`` pairs, best first, with Dice score >= ``min_score``."""
+        grams = trigrams(query)
+        arrays = [self._posting_array(gram) for gram in grams if gram in self._postings]
+        if not arrays:
+            return []
+        count = len(self._names)
+        if len(self._size_array) != count:
+            self._size_array = np.array(self._sizes, dtype=np.float64)
+        shared = np.bincount(np.concatenate(arrays), minlength=count)[:count]
+        scores = 2 * shared / (len(grams) + self._size_array)
+        candidates = np.flatnonzero(scores >= min_score)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit)[:limit]]
+        ranked = sorted(((-scores[i], self._names[i]) for i in candidates.tolist()))
+        return [(name, float(-score)) for score, name in ranked]
+
+
+matcher = MaterialMatcher(MATERIALS_DATABASE)
+catalog_index = TrigramIndex(MATERIALS_DATABASE)
+
+def suggest(query, limit=5):
+    """Catalog materials that look like a misspelling of ``query``, as ``(name, score)`` pairs."""
+    return catalog_index.search(query.lower(), limit)
@@ -0,0 +1,228 @@
+"""Process-wide latency histograms and counters in the Prometheus text format.
+
+    @metrics.timed
+    def assess_usage_with_ai(...): ...
+
+    with metrics.timer(metrics.histogram("ecoaudit_dataframe_seconds", "..."), page="History"):
+        ...
+
+Instruments bind their label set once, so recording an observation is a
+bisect and a few additions under a per-series lock, about a microsecond, and
+can stay on in production. ``render()`` returns every metric as Prometheus
+exposition text; api.py serves it at /metrics, and setting
+ECOAUDIT_METRICS_FILE makes any process (e.g. the Streamlit app) rewrite that
+file every ECOAUDIT_METRICS_INTERVAL seconds for a textfile collector.
+"""
+import atexit
+import bisect
+import contextlib
+import functools
+import inspect
+import os
+import threading
+import time
+
+# Seconds; fine-grained at the low end where cached paths land
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _number(value):
+    return str(int(value)) if value == int(value) else repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels):
+        """The series for this label set, created on first use; keep it to skip the lookup."""
+        key = tuple(sorted((name, str(value)) for name, value in labels.items()))
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            children = sorted(self._children.items())
+        for labels, child in children:
+            lines.extend(child.render(self.name, labels))
+        return lines
+
+
+class _CounterSeries:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def render(self, name, labels):
+        return [f"{name}{_label_text(labels)} {_number(self.value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterSeries()
+
+
+class _HistogramSeries:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def render(self, name, labels):
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        lines, cumulative = [], 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f"{name}_bucket{_label_text(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{name}_bucket{_label_text(labels, [('le', '+Inf')])} {count}")
+        lines.append(f"{name}_sum{_label_text(labels)} {total!r}")
+        lines.append(f"{name}_count{_label_text(labels)} {count}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramSeries(self.buckets)
+
+
+def _get_or_create(cls, name, help, **kwargs):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, help, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"{name} is already registered as a {metric.kind}")
+        return metric
+
+
+def histogram(name, help, buckets=LATENCY_BUCKETS):
+    """The histogram called ``name``, registering it on first use (safe to call on every rerun)."""
+    return _get_or_create(Histogram, name, help, buckets=buckets)
+
+
+def counter(name, help):
+    """The counter called ``name``, registering it on first use (safe to call on every rerun)."""
+    return _get_or_create(Counter, name, help)
+
+
+function_seconds = histogram("ecoaudit_function_seconds", "Time spent in instrumented functions.")
+function_errors = counter("ecoaudit_function_errors_total", "Exceptions raised by instrumented functions.")
+
+
+def timed(function):
+    """Decorator recording each call's duration and any exception, labelled with the function name."""
+    series = function_seconds.labels(function=function.__name__)
+    errors = function_errors.labels(function=function.__name__)
+
+    if inspect.iscoroutinefunction(function):
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await function(*args, **kwargs)
+            except BaseException:
+                errors.inc()
+                raise
+            finally:
+                series.observe(time.perf_counter() - started)
+    else:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            except BaseException:
+                errors.inc()
+                raise
+            finally:
+                series.observe(time.perf_counter() - started)
+    return wrapper
+
+
+@contextlib.contextmanager
+def timer(metric, **labels):
+    """Observe the time spent in the ``with`` block on ``metric`` with ``labels``."""
+    series = metric.labels(**labels)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        series.observe(time.perf_counter() - started)
+
+
+def render():
+    """Every registered metric in the Prometheus text exposition format."""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def write(path):
+    """Atomically replace ``path`` with the current metrics."""
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as f:
+        f.write(render())
+    os.replace(temporary, path)
+
+
+def export_to_file(path, interval=15.0):
+    """Rewrite ``path`` every ``interval`` seconds from a daemon thread, and once more at exit."""
+    def loop():
+        while True:
+            time.sleep(interval)
+            write(path)
+
+    threading.Thread(target=loop, name="metrics-export", daemon=True).start()
+    atexit.register(write, path)
+
+
+if os.environ.get("ECOAUDIT_METRICS_FILE"):
+    export_to_file(os.environ["ECOAUDIT_METRICS_FILE"], float(os.environ.get("ECOAUDIT_METRICS_INTERVAL", 15)))
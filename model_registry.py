@@ -0,0 +1,183 @@
+"""Process-wide registry for the trained EcoAI and MaterialAI models.
+
+Sessions never train. Once an entry point (app.py, api.py, ingest.py) calls
+``registry.start()``, the registry warm-loads the last snapshot (or trains once in a background thread when there is none) and streams newly
+saved records into the current model, which keeps it exact. Only when a
+forecaster goes stale (records arrived out of order or were backfilled) does
+it refit that household's forecaster from the store, in the background. A
+refit first waits for saves to pause for ``settle`` seconds, so a bulk load is
+refitted once rather than batch by batch. Each rerun should call ``current()`` once and use that model
+throughout, so it sees one consistent version.
+"""
+import atexit
+import os
+import threading
+import time
+
+import database
+from simple_ai_models import EcoAI, MaterialAI, UsageForecaster, load_snapshot, save_snapshot, snapshot_state
+
+
+class ModelRegistry:
+    def __init__(self, snapshot_path=None, settle=1.0):
+        self.snapshot_path = snapshot_path
+        self.settle = settle
+        self._last_saved = 0.0
+        # Guards the (version, model) reference and the counters; models update outside it
+        self._lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._version = 0
+        self._model = EcoAI()
+        self.material_model = MaterialAI()
+        self._refresh_thread = None
+        self._replay = None
+        self._started = False
+
+    def current(self):
+        """Return ``(version, model)`` for the model sessions should use right now."""
+        with self._lock:
+            return self._version, self._model
+
+    def start(self):
+        """Warm-load the snapshot if one exists, otherwise train in the background; idempotent.
+
+        Rows saved after the snapshot was written (by any process) are replayed
+        into it; a snapshot of some other store is discarded. From then on the
+        registry follows saves and writes a snapshot at exit.
+        """
+        if self._started:
+            return
+        with database.write_lock:
+            if self._started:
+                return
+            self._started = True
+            atexit.register(self.save_snapshot)
+            # Everything up to the store's mark has now reached the listeners, everything after will
+            database.sync()
+            snapshot = load_snapshot(self.snapshot_path) if self.snapshot_path else None
+            if snapshot:
+                version, model, material_model, mark = snapshot
+                store_mark = database.get_utility_mark()
+                if (mark is None) != (store_mark is None) or (mark is not None and mark > store_mark):
+                    snapshot = None
+                elif mark is not None:
+                    for tenant, columns in database.get_utility_since(mark):
+                        model.on_utility_saved(columns, tenant)
+            if snapshot:
+                with self._lock:
+                    self._version, self._model, self.material_model = version, model, material_model
+            database.add_utility_listener(self._on_utility_saved)
+        if not snapshot or not self._model.is_trained or self._model.needs_refit():
+            self.refresh()
+
+    def refresh(self, wait=False):
+        """Train in a background thread; no-op if one is already running.
+
+        An untrained model is replaced by one trained on the whole store;
+        afterwards only stale forecasters are refitted.
+        """
+        with self._lock:
+            if self._refresh_thread is None:
+                self._refresh_thread = threading.Thread(target=self._retrain, name="model-refresh", daemon=True)
+                self._refresh_thread.start()
+            thread = self._refresh_thread
+        if wait:
+            thread.join()
+
+    def _retrain(self):
+        try:
+            while True:
+                quiet = time.monotonic() - self._last_saved
+                if quiet >= self.settle:
+                    break
+                time.sleep(self.settle - quiet)
+            with self._lock:
+                model = self._model
+            if model.is_trained:
+                self._refit_stale(model)
+            else:
+                model = self._train()
+        finally:
+            with self._lock:
+                self._replay = None
+                self._refresh_thread = None
+        self.save_snapshot()
+        # Batches replayed above may have left forecasters that only a further refit can fix
+        if model.needs_refit():
+            self.refresh()
+
+    def _train(self):
+        # Everything saved after this read reaches the listener, which queues it for replay
+        with database.write_lock:
+            partitions = database.get_all_utility_columns()
+            with self._lock:
+                self._replay = []
+        model = EcoAI()
+        # Each tenant's detector and forecaster learn from that tenant's partition only
+        model.train_tenants(partitions or {database.DEFAULT_TENANT: {}})
+        # Records saved while training ran are not in the columns it read; replay them until
+        # none are left, then swap under the lock so no later record misses the new model
+        replayed = 0
+        while True:
+            with self._lock:
+                batch = self._replay[replayed:]
+                if not batch:
+                    self._version += 1
+                    self._model = model
+                    return model
+            for columns, tenant in batch:
+                model.on_utility_saved(columns, tenant)
+            replayed += len(batch)
+
+    def _refit_stale(self, model):
+        # Detectors are order-independent and stay exact; only stale forecasters are refitted
+        tenants = model.stale_tenants()
+        with database.write_lock:
+            histories = database.get_all_utility_columns(tenants)
+            with self._lock:
+                self._replay = []
+        fitted = dict(zip(tenants, UsageForecaster.fit_batch([histories[tenant] for tenant in tenants])))
+        # With write_lock held no listener is running, so the queue holds every record saved since the read
+        with database.write_lock:
+            with self._lock:
+                replay, self._replay = self._replay, None
+            for columns, tenant in replay:
+                if tenant in fitted:
+                    fitted[tenant].update(columns)
+            model.set_forecasters(fitted)
+
+    def _on_utility_saved(self, columns, tenant):
+        with self._lock:
+            model = self._model
+            self._last_saved = time.monotonic()
+            if self._replay is not None:
+                self._replay.append((columns, tenant))
+        # Listeners run one at a time under database.write_lock, so updates keep their order
+        fitted = model.on_utility_saved(columns, tenant)
+        with self._lock:
+            due = not fitted and self._refresh_thread is None
+        if due:
+            self.refresh()
+
+    def save_snapshot(self):
+        if not self.snapshot_path:
+            return
+        # Writing happens outside the locks, so current() and saves never wait on the disk
+        with self._snapshot_lock:
+            # Listeners run under write_lock, so the state copied there has learned exactly the rows up to the mark
+            with database.write_lock:
+                database.sync()
+                store_mark = database.get_utility_mark()
+                with self._lock:
+                    version, model, material_model = self._version, self._model, self.material_model
+                state = snapshot_state(model, material_model)
+            save_snapshot(self.snapshot_path, version, state, store_mark)
+
+
+def _default_snapshot_path():
+    # Snapshots describe a store's data, so only persistent stores get one
+    path = getattr(database.store, "path", None)
+    return os.environ.get("ECOAUDIT_MODEL_DIR") or (f"{os.path.splitext(path)[0]}.model" if path else None)
+
+
+registry = ModelRegistry(_default_snapshot_path())
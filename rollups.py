@@ -0,0 +1,166 @@
+"""Pre-aggregated daily, weekly and monthly utility usage.
+
+Charts read these rollups instead of raw history, so their cost depends on the
+number of buckets in view rather than the number of readings stored. Buckets
+are built from the store on first use and then updated from every saved batch.
+"""
+import threading
+
+import numpy as np
+
+import database as db
+from simple_ai_models import UTILITIES
+
+GRANULARITIES = ("day", "week", "month")
+_DAY_US = 86_400 * 1_000_000
+
+
+def bucket_keys(timestamps, granularity):
+    """Integer bucket of each epoch-microsecond timestamp: days, Monday-based weeks or months since 1970."""
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if granularity == "month":
+        return timestamps.astype("datetime64[us]").astype("datetime64[M]").astype(np.int64)
+    days = timestamps // _DAY_US
+    if granularity == "week":
+        # 1970-01-01 was a Thursday; shift so weeks start on Monday
+        return (days + 3) // 7
+    return days
+
+
+def bucket_starts(keys, granularity):
+    """datetime64 start of each bucket key."""
+    if granularity == "month":
+        return keys.astype("datetime64[M]").astype("datetime64[us]")
+    if granularity == "week":
+        keys = keys * 7 - 3
+    return keys.astype("datetime64[D]").astype("datetime64[us]")
+
+
+def choose_granularity(span):
+    """Rollup that suits a chart covering ``span`` (a timedelta); None means plot raw readings."""
+    days = span.total_seconds() / 86_400
+    if days <= 2:
+        return None
+    if days <= 92:
+        return "day"
+    if days <= 730:
+        return "week"
+    return "month"
+
+
+class UsageRollups:
+    """Count, sum, min and max per utility for every day, week and month bucket, per tenant.
+
+    Each level holds bucket keys in sorted order with aligned stat arrays. A
+    batch is grouped with ``np.unique``; if all its buckets already exist they
+    are updated in place, otherwise the level is rebuilt by merging.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = False
+        self._tenants = {}
+
+    @staticmethod
+    def _empty():
+        return {
+            "key": np.zeros(0, dtype=np.int64),
+            "count": np.zeros(0, dtype=np.int64),
+            "sum": np.zeros((0, 3)),
+            "min": np.zeros((0, 3)),
+            "max": np.zeros((0, 3)),
+        }
+
+    def start(self):
+        """Build from the store and follow new writes; idempotent."""
+        if self._started:
+            return
+        with db.write_lock:
+            if not self._started:
+                for tenant, columns in db.get_all_utility_columns().items():
+                    self.update(columns, tenant)
+                db.add_utility_listener(self.update)
+                self._started = True
+
+    def _levels(self, tenant):
+        levels = self._tenants.get(tenant)
+        if levels is None:
+            levels = {granularity: self._empty() for granularity in GRANULARITIES}
+        return levels
+
+    def update(self, columns, tenant=db.DEFAULT_TENANT):
+        timestamps = np.asarray(columns["timestamp"], dtype=np.int64)
+        if not len(timestamps):
+            return
+        usage = np.column_stack([np.asarray(columns[name], dtype=np.float64) for name in UTILITIES])
+        with self._lock:
+            levels = self._tenants.setdefault(tenant, self._levels(tenant))
+            for granularity in GRANULARITIES:
+                self._merge(levels, granularity, *self._aggregate(bucket_keys(timestamps, granularity), usage))
+
+    @staticmethod
+    def _aggregate(keys, usage):
+        unique, inverse = np.unique(keys, return_inverse=True)
+        count = np.bincount(inverse, minlength=len(unique))
+        total = np.zeros((len(unique), 3))
+        low = np.full((len(unique), 3), np.inf)
+        high = np.full((len(unique), 3), -np.inf)
+        np.add.at(total, inverse, usage)
+        np.minimum.at(low, inverse, usage)
+        np.maximum.at(high, inverse, usage)
+        return unique, count, total, low, high
+
+    @staticmethod
+    def _merge(levels, granularity, keys, count, total, low, high):
+        level = levels[granularity]
+        position = np.searchsorted(level["key"], keys)
+        known = position < len(level["key"])
+        known[known] = level["key"][position[known]] == keys[known]
+        if known.all():
+            level["count"][position] += count
+            level["sum"][position] += total
+            np.minimum.at(level["min"], position, low)
+            np.maximum.at(level["max"], position, high)
+            return
+        merged_keys = np.concatenate([level["key"], keys])
+        unique, inverse = np.unique(merged_keys, return_inverse=True)
+        merged = {
+            "key": unique,
+            "count": np.bincount(inverse, weights=np.concatenate([level["count"], count]), minlength=len(unique)).astype(np.int64),
+            "sum": np.zeros((len(unique), 3)),
+            "min": np.full((len(unique), 3), np.inf),
+            "max": np.full((len(unique), 3), -np.inf),
+        }
+        np.add.at(merged["sum"], inverse, np.concatenate([level["sum"], total]))
+        np.minimum.at(merged["min"], inverse, np.concatenate([level["min"], low]))
+        np.maximum.at(merged["max"], inverse, np.concatenate([level["max"], high]))
+        levels[granularity] = merged
+
+    def span(self, tenant=db.DEFAULT_TENANT):
+        """Time covered by the tenant's stored readings, to the day."""
+        self.start()
+        with self._lock:
+            days = self._levels(tenant)["day"]["key"]
+            return np.timedelta64(int(days[-1] - days[0]) + 1 if len(days) else 0, "D").astype(object)
+
+    def query(self, granularity, start=None, end=None, tenant=db.DEFAULT_TENANT):
+        """DataFrame of the tenant's buckets touching ``start``..``end`` with per-utility sum, mean, min and max."""
+        import pandas as pd
+
+        self.start()
+        with self._lock:
+            level = self._levels(tenant)[granularity]
+            lo = 0 if start is None else np.searchsorted(level["key"], bucket_keys([db.to_epoch_us(start)], granularity)[0])
+            hi = len(level["key"]) if end is None else np.searchsorted(level["key"], bucket_keys([db.to_epoch_us(end)], granularity)[0], side="right")
+            keys, count = level["key"][lo:hi].copy(), level["count"][lo:hi].copy()
+            total, low, high = level["sum"][lo:hi].copy(), level["min"][lo:hi].copy(), level["max"][lo:hi].copy()
+        data = {"period": bucket_starts(keys, granularity), "count": count}
+        for i, name in enumerate(UTILITIES):
+            data[f"{name}_sum"] = total[:, i]
+            data[f"{name}_mean"] = total[:, i] / count
+            data[f"{name}_min"] = low[:, i]
+            data[f"{name}_max"] = high[:, i]
+        return pd.DataFrame(data)
+
+
+usage_rollups = UsageRollups()
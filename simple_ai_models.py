@@ -1,26 +1,473 @@
-import random
+import json
+import math
+import os
+import shutil
+import threading
+
+import numpy as np
+
+from database import DEFAULT_TENANT, STATUS_LABELS
+
+UTILITIES = ("water_gallons", "electricity_kwh", "gas_cubic_m")
+# Normal monthly ranges from the help center, one row per utility: (low, high)
+USAGE_RANGES = np.array([[3000.0, 12000.0], [300.0, 800.0], [50.0, 150.0]])
+# With a household baseline the normal range becomes this band around it
+BASELINE_BAND = (0.5, 1.5)
+
+def usage_matrix(readings):
+    """(n, 3) float64 array of water, electricity and gas.
+
+    Accepts a DataFrame or dict of columns, a list of reading dicts, or an
+    array-like of rows.
+    """
+    if hasattr(readings, "columns"):
+        return readings[list(UTILITIES)].to_numpy(dtype=np.float64)
+    if isinstance(readings, dict):
+        return np.column_stack([np.asarray(readings[name], dtype=np.float64) for name in UTILITIES])
+    if isinstance(readings, list) and readings and isinstance(readings[0], dict):
+        return np.array([[reading[name] for name in UTILITIES] for reading in readings], dtype=np.float64)
+    return np.asarray(readings, dtype=np.float64).reshape(-1, 3)
+
+def status_labels(codes):
+    """Map status codes from assess_usage_batch to their Low/Normal/High labels."""
+    return np.array(STATUS_LABELS)[codes]
+
+class UsageAnomalyDetector:
+    """Streaming per-utility mean and variance for anomaly scoring.
+
+    Each batch of readings is folded into the running statistics with the
+    parallel form of Welford's algorithm, so an update costs O(batch) and never
+    revisits older readings.
+    """
+
+    min_samples = 3
+
+    def __init__(self):
+        self.count = 0
+        self.mean = np.zeros(3)
+        self.m2 = np.zeros(3)
+        self._lock = threading.Lock()
+
+    def update(self, readings):
+        usage = usage_matrix(readings)
+        n = len(usage)
+        if not n:
+            return
+        batch_mean = usage.mean(axis=0)
+        batch_m2 = ((usage - batch_mean) ** 2).sum(axis=0)
+        with self._lock:
+            total = self.count + n
+            delta = batch_mean - self.mean
+            self.m2 = self.m2 + batch_m2 + delta ** 2 * (self.count * n / total)
+            self.mean = self.mean + delta * (n / total)
+            self.count = total
+
+    def state(self):
+        """Consistent copy of ``(count, mean, m2)``."""
+        with self._lock:
+            return self.count, self.mean.copy(), self.m2.copy()
+
+    def std(self):
+        if self.count < 2:
+            return np.zeros(3)
+        return np.sqrt(self.m2 / (self.count - 1))
+
+    def zscores(self, reading):
+        with self._lock:
+            mean, std = self.mean, self.std()
+        deviation = np.abs(usage_matrix(reading)[0] - mean)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(deviation == 0, 0.0, deviation / std)
+
+    def anomaly_probability(self, reading):
+        """Deterministic score in [0, 1] from the largest z-score across utilities.
+
+        Readings within one standard deviation score 0; beyond that the score
+        follows the two-sided normal probability of the excess, so two
+        deviations out scores about 0.68 and three about 0.95.
+        """
+        if self.count < self.min_samples:
+            return 0.0
+        excess = max(float(self.zscores(reading).max()) - 1.0, 0.0)
+        return math.erf(excess / math.sqrt(2))
+
+
+# Holt-Winters smoothing weights (alpha for level, beta for trend, gamma for
+# season) tried side by side; each utility uses the row with the lowest
+# one-step-ahead squared error so far.
+SMOOTHING_GRID = np.array([
+    (alpha, beta, gamma)
+    for alpha in (0.1, 0.3, 0.5, 0.8) for beta in (0.0, 0.1, 0.3) for gamma in (0.0, 0.1, 0.3)
+])
+# Trend damping, so a forecast does not run away on a short streak
+TREND_DAMPING = 0.9
+SEASONS = 12
+# Readings of one saved batch folded into a live forecaster; the rest of a
+# larger batch waits for the registry's next refit
+FOLD_WINDOW = 2 * SEASONS
+# Most households UsageForecaster.fit_batch steps through together
+FIT_GROUP = 512
+
+def reading_timestamps(readings):
+    """int64 epoch microseconds of every reading's ``timestamp``, in the same shapes usage_matrix accepts."""
+    if isinstance(readings, list):
+        values = [reading["timestamp"] for reading in readings]
+    else:
+        values = readings["timestamp"]
+        values = values.to_numpy() if hasattr(values, "to_numpy") else values
+    values = np.asarray(values)
+    if values.dtype.kind in "iu":
+        return values.astype(np.int64).reshape(-1)
+    return values.astype("datetime64[us]").astype(np.int64).reshape(-1)
+
+def _season(timestamps_us):
+    """Calendar month (0-11) of epoch-microsecond timestamps."""
+    return np.asarray(timestamps_us).astype("datetime64[us]").astype("datetime64[M]").astype(np.int64) % SEASONS
+
+def _fold(level, trend, seasonal, sse, count, usage, seasons, valid):
+    """Run the smoothing recursion over ``usage`` (k, n, 3), updating the state arrays in place.
+
+    State arrays carry a leading household axis k and a SMOOTHING_GRID axis:
+    level, trend and sse are (k, g, 3), seasonal is (k, g, 3, SEASONS) and
+    count is (k,). ``valid`` (k, n) masks the padding of shorter histories.
+    The loop is over readings only; every step updates all households,
+    weight rows and utilities at once, in error-correction form.
+
+    The first SEASONS readings initialise the state instead of smoothing it.
+    Meanwhile the level is their running mean and the seasonal array buffers
+    each month's latest reading (NaN for months not seen yet); once the cycle
+    is complete every month's term becomes its reading's offset from the
+    mean of the cycle, 0 for months it did not cover, and smoothing starts.
+    """
+    alpha = SMOOTHING_GRID[:, 0, None]
+    alpha_beta = alpha * SMOOTHING_GRID[:, 1, None]
+    alpha_gamma = (1 - alpha) * SMOOTHING_GRID[:, 2, None]
+    rows = np.arange(len(count))
+    for step in range(usage.shape[1]):
+        live = valid[:, step]
+        y = usage[:, step, None, :]
+        months = seasons[:, step]
+        season = seasonal[rows, :, :, months]
+        damped = TREND_DAMPING * trend
+        error = y - level - damped - season
+        if live.all() and count.min() >= SEASONS:
+            # Every household is past its first cycle: plain in-place updates
+            sse += error * error
+            level += damped + alpha * error
+            trend[...] = damped + alpha_beta * error
+            seasonal[rows, :, :, months] = season + alpha_gamma * error
+            count += 1
+            continue
+        if not live.any():
+            continue
+        fresh = live & (count == 0)
+        if fresh.any():
+            seasonal[fresh] = np.nan
+            season = seasonal[rows, :, :, months]
+        warm = (count < SEASONS)[:, None, None]
+        on = live[:, None, None]
+        # Warm-up steps add the same error to every weight row, so they would not change the choice
+        sse += np.where(on & ~warm, error * error, 0.0)
+        new_level = np.where(warm, level + (y - level) / (count + 1)[:, None, None], level + damped + alpha * error)
+        new_trend = np.where(warm, 0.0, damped + alpha_beta * error)
+        new_season = np.where(warm, y, season + alpha_gamma * error)
+        level[...] = np.where(on, new_level, level)
+        trend[...] = np.where(on, new_trend, trend)
+        seasonal[rows, :, :, months] = np.where(on, new_season, season)
+        count += live
+        cycle_done = live & (count == SEASONS)
+        if cycle_done.any():
+            buffered = seasonal[cycle_done]
+            seasonal[cycle_done] = np.where(np.isnan(buffered), 0.0, buffered - level[cycle_done][..., None])
+
+def _forecast(level, trend, seasonal, sse, count, seasons):
+    """One-step forecasts (k, 3) into calendar month ``seasons`` (k,) with each utility's best weights.
+
+    Households still in their first cycle (``count`` below SEASONS) get their running mean.
+    """
+    best = sse.argmin(axis=1)[:, None, :]
+    rows = np.arange(len(level))
+    pick = lambda array: np.take_along_axis(array, best, axis=1)[:, 0, :]
+    season = np.where((count >= SEASONS)[:, None, None], seasonal[rows, :, :, seasons], 0.0)
+    return np.maximum(pick(level) + TREND_DAMPING * pick(trend) + pick(season), 0.0)
+
+
+class UsageForecaster:
+    """Next-reading forecasts for one household from damped-trend Holt-Winters smoothing.
+
+    Readings are smoothed in timestamp order, with an additive seasonal term
+    per calendar month, for all three utilities and every SMOOTHING_GRID row
+    at once. Each update folds only the new readings into the state and the
+    squared-error tallies, so the weights are re-chosen as data arrives
+    without ever refitting. ``fit_batch`` and ``forecast_batch`` run the same
+    recursion across many households in one vectorised pass.
+
+    ``stale`` is set once the state no longer matches a fit of the full
+    history, because readings arrived back-dated or too many at once; the
+    owner should then replace the forecaster with a refit.
+    """
+
+    def __init__(self):
+        grid = len(SMOOTHING_GRID)
+        self.count = 0
+        self.stale = False
+        self.last_timestamp = np.iinfo(np.int64).min
+        self.level = np.zeros((grid, 3))
+        self.trend = np.zeros((grid, 3))
+        self.seasonal = np.zeros((grid, 3, SEASONS))
+        self.sse = np.zeros((grid, 3))
+        self._lock = threading.Lock()
+
+    def _arrays(self):
+        return self.level, self.trend, self.seasonal, self.sse
+
+    def _own_arrays(self):
+        # State loaded from a snapshot is a read-only view of the memory-mapped file until first updated
+        if not self.level.flags.writeable:
+            self.level, self.trend, self.seasonal, self.sse = (np.array(array) for array in self._arrays())
+
+    def state(self):
+        """Consistent copy of ``(count, stale, last_timestamp, level, trend, seasonal, sse)``."""
+        with self._lock:
+            return (self.count, self.stale, self.last_timestamp, *(array.copy() for array in self._arrays()))
+
+    def update(self, readings):
+        """Fold newly saved readings into the state; returns False once it needs a refit.
+
+        Readings older than the last one folded are skipped, and of the rest
+        only the newest FOLD_WINDOW are folded, so an update stays cheap
+        whatever the batch size. Skipping anything marks the forecaster stale.
+        """
+        usage = usage_matrix(readings)
+        if not len(usage):
+            return not self.stale
+        timestamps = reading_timestamps(readings)
+        order = np.argsort(timestamps, kind="stable")
+        usage, timestamps = usage[order], timestamps[order]
+        with self._lock:
+            start = int(np.searchsorted(timestamps, self.last_timestamp))
+            start = max(start, len(usage) - FOLD_WINDOW)
+            if start:
+                self.stale = True
+            if start < len(usage):
+                self._own_arrays()
+                count = np.array([self.count])
+                _fold(*(array[None] for array in self._arrays()), count, usage[None, start:],
+                      _season(timestamps[start:])[None], np.ones((1, len(usage) - start), dtype=bool))
+                self.count = int(count[0])
+                self.last_timestamp = int(timestamps[-1])
+            return not self.stale
+
+    def forecast(self, reading=None):
+        """Forecast for the month after ``reading``, or after the last reading seen.
+
+        A ``reading`` newer than everything folded in so far (an assessment
+        not saved yet) is taken into account without being kept. Returns a
+        length-3 array, or None with no readings at all.
+        """
+        with self._lock:
+            arrays = [array[None].copy() for array in self._arrays()]
+            count = np.array([self.count])
+            last_timestamp = self.last_timestamp
+        timestamp = last_timestamp
+        if reading is not None:
+            timestamp = int(reading_timestamps(reading)[0])
+            if timestamp > last_timestamp:
+                _fold(*arrays, count, usage_matrix(reading)[None], _season([timestamp])[None], np.ones((1, 1), dtype=bool))
+        if not count[0]:
+            return None
+        return _forecast(*arrays, count, (_season([timestamp]) + 1) % SEASONS)[0]
+
+    @classmethod
+    def fit_batch(cls, histories):
+        """One forecaster per history (columns, DataFrame or records), fitted in vectorised passes.
+
+        Households are fitted together in groups of at most FIT_GROUP whose
+        history lengths are within a factor of two of each other, so a long
+        history neither pads every other household to its length nor makes
+        them step through it.
+        """
+        usages = [usage_matrix(history) if len(history) else np.empty((0, 3)) for history in histories]
+        stamps = [reading_timestamps(history) if len(usage) else np.empty(0, np.int64)
+                  for history, usage in zip(histories, usages)]
+        orders = [np.argsort(timestamps, kind="stable") for timestamps in stamps]
+        usages = [usage[order] for usage, order in zip(usages, orders)]
+        stamps = [timestamps[order] for timestamps, order in zip(stamps, orders)]
+
+        forecasters = [cls() for _ in histories]
+        group = []
+        for i in sorted(range(len(usages)), key=lambda i: len(usages[i])) + [None]:
+            if group and (i is None or len(group) == FIT_GROUP
+                          or len(usages[i]).bit_length() != len(usages[group[0]]).bit_length()):
+                _fit_group([forecasters[j] for j in group], [usages[j] for j in group], [stamps[j] for j in group])
+                group = []
+            if i is not None and len(usages[i]):
+                group.append(i)
+        return forecasters
+
+def _fit_group(forecasters, usages, stamps):
+    """Fit fresh ``forecasters`` to their sorted histories in one padded pass."""
+    k, n, grid = len(usages), max(map(len, usages)), len(SMOOTHING_GRID)
+    usage = np.zeros((k, n, 3))
+    seasons = np.zeros((k, n), dtype=np.int64)
+    valid = np.zeros((k, n), dtype=bool)
+    for i, (household, timestamps) in enumerate(zip(usages, stamps)):
+        usage[i, :len(household)] = household
+        seasons[i, :len(household)] = _season(timestamps)
+        valid[i, :len(household)] = True
+    level, trend, sse = np.zeros((k, grid, 3)), np.zeros((k, grid, 3)), np.zeros((k, grid, 3))
+    seasonal, count = np.zeros((k, grid, 3, SEASONS)), np.zeros(k, dtype=np.int64)
+    _fold(level, trend, seasonal, sse, count, usage, seasons, valid)
+    for i, (forecaster, timestamps) in enumerate(zip(forecasters, stamps)):
+        forecaster.level, forecaster.trend, forecaster.seasonal, forecaster.sse = level[i], trend[i], seasonal[i], sse[i]
+        forecaster.count = int(count[i])
+        forecaster.last_timestamp = int(timestamps[-1])
+
+def forecast_batch(forecasters):
+    """Forecasts (k, 3) for the month after each forecaster's last reading; NaN rows where it has none."""
+    if not forecasters:
+        return np.empty((0, 3))
+    states = []
+    for forecaster in forecasters:
+        with forecaster._lock:
+            states.append((*forecaster._arrays(), forecaster.count, forecaster.last_timestamp))
+    level, trend, seasonal, sse = (np.stack([state[i] for state in states]) for i in range(4))
+    counts = np.array([state[4] for state in states])
+    last = np.array([max(state[5], 0) for state in states])
+    forecasts = _forecast(level, trend, seasonal, sse, counts, (_season(last) + 1) % SEASONS)
+    forecasts[counts == 0] = np.nan
+    return forecasts
+
+
+# Read-only stand-ins for households without saved readings
+_NO_DETECTOR = UsageAnomalyDetector()
+_NO_FORECASTER = UsageForecaster()
 
 class EcoAI:
     def __init__(self):
         self.is_trained = False
         self.model_performance = {}
+        self.usage_ranges = USAGE_RANGES
+        # One anomaly baseline and one forecaster per tenant, so households are only compared with themselves
+        self.detectors = {}
+        self.forecasters = {}
+        self._tenants_lock = threading.Lock()
+
+    def detector(self, tenant=DEFAULT_TENANT):
+        """The tenant's detector for reading; households with no saved readings share an empty one."""
+        return self.detectors.get(tenant, _NO_DETECTOR)
+
+    def forecaster(self, tenant=DEFAULT_TENANT):
+        """The tenant's forecaster for reading; households with no saved readings share an empty one."""
+        return self.forecasters.get(tenant, _NO_FORECASTER)
+
+    # Only saved readings (and snapshots of them) create per-tenant state
+    def _detector_to_update(self, tenant):
+        detector = self.detectors.get(tenant)
+        if detector is None:
+            with self._tenants_lock:
+                detector = self.detectors.setdefault(tenant, UsageAnomalyDetector())
+        return detector
 
-    def train_models(self, data):
+    def _forecaster_to_update(self, tenant):
+        forecaster = self.forecasters.get(tenant)
+        if forecaster is None:
+            with self._tenants_lock:
+                forecaster = self.forecasters.setdefault(tenant, UsageForecaster())
+        return forecaster
+
+    def training_samples(self):
+        return sum(detector.count for detector in list(self.detectors.values()))
+
+    def train_models(self, data, tenant=DEFAULT_TENANT):
+        # The detector and forecaster are kept current by on_utility_saved, so only seed them when empty
+        # (or, for a stale forecaster, refit it)
+        if len(data) and self.detector(tenant).count == 0:
+            self._detector_to_update(tenant).update(data)
+        forecaster = self.forecaster(tenant)
+        if len(data) and (forecaster.count == 0 or forecaster.stale):
+            with self._tenants_lock:
+                self.forecasters[tenant] = UsageForecaster.fit_batch([data])[0]
         self.is_trained = True
-        self.model_performance = {'anomaly_accuracy': 0.85, 'training_samples': len(data)}
+        self.model_performance = {'anomaly_accuracy': 0.85, 'training_samples': self.training_samples()}
         return True, "Model trained"
 
+    def train_tenants(self, partitions):
+        """train_models for every ``{tenant: history}``, fitting the empty or stale forecasters in one batch."""
+        unfitted = [
+            tenant for tenant, data in partitions.items()
+            if len(data) and (self.forecaster(tenant).count == 0 or self.forecaster(tenant).stale)
+        ]
+        fitted = UsageForecaster.fit_batch([partitions[tenant] for tenant in unfitted])
+        with self._tenants_lock:
+            self.forecasters.update(zip(unfitted, fitted))
+        for tenant, data in partitions.items():
+            self.train_models(data, tenant)
+        return True, "Model trained"
+
+    def on_utility_saved(self, columns, tenant=DEFAULT_TENANT):
+        """Learn from newly saved readings; returns False when the tenant's forecaster now needs a refit."""
+        self._detector_to_update(tenant).update(columns)
+        fitted = self._forecaster_to_update(tenant).update(columns)
+        if self.is_trained:
+            self.model_performance['training_samples'] = self.training_samples()
+        return fitted
+
+    def needs_refit(self):
+        """Whether any tenant's forecaster is stale and should be refitted from the store."""
+        return any(forecaster.stale for forecaster in list(self.forecasters.values()))
+
+    def stale_tenants(self):
+        return [tenant for tenant, forecaster in list(self.forecasters.items()) if forecaster.stale]
+
+    def set_forecasters(self, forecasters):
+        """Swap in refitted ``{tenant: UsageForecaster}``."""
+        with self._tenants_lock:
+            self.forecasters.update(forecasters)
+
     def assess_usage(self, water, electricity, gas, history):
-        return "Normal", "Normal", "Normal"
+        return tuple(
+            STATUS_LABELS[(value >= low) + (value > high)]
+            for value, (low, high) in zip((water, electricity, gas), self.usage_ranges.tolist())
+        )
+
+    def assess_usage_batch(self, readings, baselines=None):
+        """Assess many readings at once.
 
-    def predict_usage(self, current_data):
+        ``readings`` is a DataFrame with the usage columns or an (n, 3) array of
+        water, electricity and gas. ``baselines`` optionally gives each row's
+        household average in the same shape (NaN where a household has none);
+        those rows are judged against BASELINE_BAND around it instead of the
+        help center ranges. Returns an (n, 3) int8 array of status codes.
+        """
+        usage = usage_matrix(readings)
+        low, high = self.usage_ranges[:, 0], self.usage_ranges[:, 1]
+        if baselines is not None:
+            baselines = np.broadcast_to(np.asarray(baselines, dtype=np.float64), usage.shape)
+            personal = ~np.isnan(baselines)
+            low = np.where(personal, baselines * BASELINE_BAND[0], low)
+            high = np.where(personal, baselines * BASELINE_BAND[1], high)
+        return (usage >= low).view(np.int8) + (usage > high).view(np.int8)
+
+    def predict_usage(self, current_data, tenant=DEFAULT_TENANT):
+        """Next month's usage for ``tenant`` given the reading ``current_data``, from its UsageForecaster."""
+        forecast = self.forecaster(tenant).forecast([current_data]).tolist()
         return {
-            "water_prediction": current_data["water_gallons"] * 1.05,
-            "electricity_prediction": current_data["electricity_kwh"] * 1.02,
-            "gas_prediction": current_data["gas_cubic_m"] * 0.98,
-            "anomaly_probability": random.random()
+            "water_prediction": forecast[0],
+            "electricity_prediction": forecast[1],
+            "gas_prediction": forecast[2],
+            "anomaly_probability": self.detector(tenant).anomaly_probability([current_data])
         }
 
+    def predict_usage_batch(self, tenants):
+        """Next-month forecasts for many households in one vectorised call.
+
+        Returns an (n, 3) array of water, electricity and gas forecasts in
+        ``tenants`` order, following each household's last saved reading; rows
+        of households with no readings are NaN.
+        """
+        return forecast_batch([self.forecaster(tenant) for tenant in tenants])
+
     def generate_recommendations(self, water, electricity, gas):
         return [{
             "category": "Water Saving",
@@ -39,13 +486,153 @@ class EcoAI:
         }
 
 class MaterialAI:
+    def __init__(self):
+        # Score table: one row per category with sustainability, environmental impact
+        # and recyclability. Every material currently maps to the plastic profile.
+        self.categories = np.array(["plastic"])
+        self.scores = np.array([[6.5, 4.2, 7.8]])
+
+    def category_codes(self, names):
+        return np.zeros(len(names), dtype=np.intp)
+
     def analyze_material(self, material):
+        code = self.category_codes([material])[0]
+        sustainability_score, environmental_impact, recyclability = self.scores[code].tolist()
         return {
-            "sustainability_score": 6.5,
-            "environmental_impact": 4.2,
-            "recyclability": 7.8,
-            "category": "plastic"
+            "sustainability_score": sustainability_score,
+            "environmental_impact": environmental_impact,
+            "recyclability": recyclability,
+            "category": str(self.categories[code])
         }
 
-eco_ai = EcoAI()
-material_ai = MaterialAI()
+    def analyze_materials(self, names):
+        """Score many materials at once; returns one DataFrame row per name, in input order."""
+        import pandas as pd
+
+        names = list(names)
+        codes = self.category_codes(names)
+        scores = self.scores[codes]
+        return pd.DataFrame({
+            "material": names,
+            "sustainability_score": scores[:, 0],
+            "environmental_impact": scores[:, 1],
+            "recyclability": scores[:, 2],
+            "category": self.categories[codes],
+        })
+
+SNAPSHOT_FORMAT = 6
+
+def snapshot_state(eco_model, material_model):
+    """Copy both models' parameters for save_snapshot, as ``(arrays, eco_ai header)``.
+
+    The model may keep learning meanwhile: each detector and forecaster is
+    copied under its own lock.
+    """
+    with eco_model._tenants_lock:
+        detectors = sorted(eco_model.detectors.items())
+        forecasters = sorted(eco_model.forecasters.items())
+    tenants = [tenant for tenant, _ in detectors]
+    forecaster_tenants = [tenant for tenant, _ in forecasters]
+    # Transpose per-object states into one sequence per field
+    detector_state = list(zip(*(detector.state() for _, detector in detectors))) or [()] * 3
+    forecaster_state = list(zip(*(forecaster.state() for _, forecaster in forecasters))) or [()] * 7
+    count, mean, m2 = detector_state
+    forecaster_count, stale, last_timestamp, level, trend, seasonal, sse = forecaster_state
+    grid = len(SMOOTHING_GRID)
+    arrays = {
+        "usage_ranges": eco_model.usage_ranges,
+        "detector_tenants": np.array(tenants, dtype=str).reshape(-1),
+        "detector_count": np.array(count, dtype=np.int64),
+        "detector_mean": np.array(mean).reshape(-1, 3),
+        "detector_m2": np.array(m2).reshape(-1, 3),
+        "forecaster_tenants": np.array(forecaster_tenants, dtype=str).reshape(-1),
+        "forecaster_count": np.array(forecaster_count, dtype=np.int64),
+        "forecaster_stale": np.array(stale, dtype=bool),
+        "forecaster_last_timestamp": np.array(last_timestamp, dtype=np.int64),
+        "forecaster_level": np.array(level).reshape(-1, grid, 3),
+        "forecaster_trend": np.array(trend).reshape(-1, grid, 3),
+        "forecaster_seasonal": np.array(seasonal).reshape(-1, grid, 3, SEASONS),
+        "forecaster_sse": np.array(sse).reshape(-1, grid, 3),
+        "material_scores": material_model.scores,
+        "material_categories": material_model.categories,
+    }
+    return arrays, {"is_trained": eco_model.is_trained, "model_performance": dict(eco_model.model_performance)}
+
+def save_snapshot(path, version, state, store_mark=None):
+    """Write a snapshot_state() ``state`` under the directory ``path`` as snapshot ``version``.
+
+    Numeric parameters go to one ``.npy`` file each, next to a ``meta.json``
+    header, in a fresh subdirectory; the ``CURRENT`` file is then repointed
+    atomically, so readers never see a half-written snapshot. Only the current
+    and previous snapshots are kept. ``store_mark`` is the store's
+    database.get_utility_mark() for the rows the models have learned.
+    """
+    arrays, eco_header = state
+    name = f"v{version}.{os.getpid()}"
+    directory = os.path.join(path, name)
+    os.makedirs(directory, exist_ok=True)
+    for key, array in arrays.items():
+        np.save(os.path.join(directory, f"{key}.npy"), np.ascontiguousarray(array))
+    meta = {
+        "format": SNAPSHOT_FORMAT,
+        "version": version,
+        "store_mark": store_mark,
+        "eco_ai": eco_header,
+        "arrays": {key: {"dtype": str(array.dtype), "shape": list(array.shape)} for key, array in arrays.items()},
+    }
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    pointer = os.path.join(path, f"CURRENT.{os.getpid()}")
+    with open(pointer, "w") as f:
+        f.write(name)
+    os.replace(pointer, os.path.join(path, "CURRENT"))
+
+    snapshots = sorted((entry for entry in os.scandir(path) if entry.is_dir()), key=lambda entry: entry.stat().st_mtime)
+    for entry in snapshots[:-2]:
+        if entry.name != name:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+def load_snapshot(path, mmap_mode="r"):
+    """Load ``(version, EcoAI, MaterialAI, store_mark)`` from the current snapshot under ``path``, or None.
+
+    Everything stays memory-mapped, so worker processes share one copy of the
+    pages: detectors and forecasters start as read-only views of their rows.
+    Detector updates replace their arrays rather than writing to them, and a
+    forecaster copies its rows the first time it folds in new readings.
+    """
+    try:
+        with open(os.path.join(path, "CURRENT")) as f:
+            directory = os.path.join(path, f.read().strip())
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return None
+    if meta["format"] != SNAPSHOT_FORMAT:
+        return None
+    arrays = {key: np.load(os.path.join(directory, f"{key}.npy"), mmap_mode=mmap_mode) for key in meta["arrays"]}
+
+    eco_model = EcoAI()
+    eco_model.is_trained = meta["eco_ai"]["is_trained"]
+    eco_model.model_performance = meta["eco_ai"]["model_performance"]
+    eco_model.usage_ranges = arrays["usage_ranges"]
+    for i, tenant in enumerate(arrays["detector_tenants"].tolist()):
+        detector = eco_model._detector_to_update(tenant)
+        detector.count = int(arrays["detector_count"][i])
+        detector.mean = arrays["detector_mean"][i]
+        detector.m2 = arrays["detector_m2"][i]
+    for i, tenant in enumerate(arrays["forecaster_tenants"].tolist()):
+        forecaster = eco_model._forecaster_to_update(tenant)
+        forecaster.count = int(arrays["forecaster_count"][i])
+        forecaster.stale = bool(arrays["forecaster_stale"][i])
+        forecaster.last_timestamp = int(arrays["forecaster_last_timestamp"][i])
+        forecaster.level = arrays["forecaster_level"][i]
+        forecaster.trend = arrays["forecaster_trend"][i]
+        forecaster.seasonal = arrays["forecaster_seasonal"][i]
+        forecaster.sse = arrays["forecaster_sse"][i]
+
+    material_model = MaterialAI()
+    material_model.scores = arrays["material_scores"]
+    material_model.categories = arrays["material_categories"]
+    return meta["version"], eco_model, material_model, meta["store_mark"]
+
@@ -0,0 +1,247 @@
+"""Seeded synthetic workloads: household meter readings and material search streams.
+
+    python workload.py --households 5000 --years 3 --readings readings.csv
+    python workload.py --households 200 --frequency daily --store
+    python workload.py --households 0 --queries 1000000 --queries-out queries.jsonl
+
+Readings follow per-household base levels with seasonal cycles (water and
+electricity peak in summer, gas in winter), a slow yearly drift and
+multiplicative noise. A ``--leak-rate`` share of households get a leak that
+raises water or gas use for a stretch of periods, and every reading has an
+``--anomaly-rate`` chance of being a meter spike or drop; files carry these as
+an ``event`` column (ignored by ingest.py) so detectors can be scored against
+them. Material queries draw catalog names with Zipfian popularity and
+misspell a ``--misspell-rate`` share of them.
+
+Every household and query chunk has its own seeded generator, so output is
+identical for a given seed and is produced one household or chunk at a time:
+memory stays constant however many households or years are generated.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+import numpy as np
+
+import database as db
+from materials import MATERIALS_DATABASE, matcher
+from simple_ai_models import EcoAI, UTILITIES
+
+# Typical monthly use per utility, matching the middle of the help center ranges
+BASE_USAGE = np.array([7000.0, 550.0, 100.0])
+# Per utility: relative amplitude of the yearly cycle and the day of year it peaks on
+SEASONALITY = np.array([[0.20, 200.0], [0.25, 200.0], [0.60, 15.0]])
+DAYS_PER_MONTH = 365.25 / 12
+# Use on Saturdays and Sundays relative to weekdays, for daily readings
+WEEKEND_FACTOR = np.array([1.15, 1.10, 1.05])
+EVENTS = ("", "leak", "anomaly")
+NO_EVENT, LEAK, ANOMALY = range(len(EVENTS))
+
+_KEYBOARD_ROWS = ("qwertyuiop", "asdfghjkl", "zxcvbnm")
+_NEIGHBOURS = {
+    char: row[max(i - 1, 0):i] + row[i + 1:i + 2]
+    for row in _KEYBOARD_ROWS for i, char in enumerate(row)
+}
+
+
+def household_ids(count):
+    return [f"household-{i:05d}" for i in range(count)]
+
+
+def _timestamps(start, periods, frequency):
+    """Period start dates as datetime64[D]."""
+    if frequency == "monthly":
+        return (np.datetime64(start, "M") + np.arange(periods)).astype("datetime64[D]")
+    return np.datetime64(start, "D") + np.arange(periods)
+
+
+def household_readings(index, start, periods, frequency="monthly", seed=0, leak_rate=0.05, anomaly_rate=0.01):
+    """``(usage, events)`` for household ``index``: an (periods, 3) array and an int8 code per period."""
+    rng = np.random.default_rng([seed, 0, index])
+    days = _timestamps(start, periods, frequency)
+    day_of_year = (days - days.astype("datetime64[Y]")).astype(np.float64)
+    years = (days - days[0]).astype(np.float64) / 365.25
+
+    level = BASE_USAGE * rng.lognormal(0.0, 0.3) * rng.lognormal(0.0, 0.15, 3)
+    amplitude, peak = SEASONALITY[:, 0] * rng.uniform(0.7, 1.3, 3), SEASONALITY[:, 1]
+    seasonal = 1 + amplitude * np.cos(2 * np.pi * (day_of_year[:, None] - peak) / 365.25)
+    drift = (1 + rng.normal(0.0, 0.03, 3)) ** years[:, None]
+    usage = level * seasonal * drift
+    if frequency == "daily":
+        weekend = ((days.astype(np.int64) + 3) % 7 >= 5)[:, None]
+        usage = usage / DAYS_PER_MONTH * np.where(weekend, WEEKEND_FACTOR, 1.0)
+    usage *= rng.lognormal(0.0, 0.08 if frequency == "monthly" else 0.2, usage.shape)
+
+    events = np.zeros(periods, dtype=np.int8)
+    if periods and rng.random() < leak_rate:
+        # A water or gas leak lasting about three months
+        utility = rng.choice([0, 2])
+        first = rng.integers(periods)
+        length = rng.geometric(1 / (3 if frequency == "monthly" else 90))
+        usage[first:first + length, utility] *= 1 + rng.uniform(0.4, 1.5)
+        events[first:first + length] = LEAK
+    spikes = rng.random(periods) < anomaly_rate
+    if spikes.any():
+        rows = np.flatnonzero(spikes)
+        factor = np.where(rng.random(len(rows)) < 0.5, rng.uniform(0.05, 0.3, len(rows)), rng.uniform(2.5, 5.0, len(rows)))
+        usage[rows, rng.integers(3, size=len(rows))] *= factor
+        events[rows] = ANOMALY
+    return usage.round(1), events
+
+
+def readings(households, start="2022-01", periods=36, frequency="monthly", seed=0, leak_rate=0.05, anomaly_rate=0.01):
+    """Yield ``(household, columns)`` per household, columns keyed like db.UTILITY_COLUMNS plus ``event``.
+
+    Statuses are assessed on the monthly-equivalent rate, so daily readings
+    get the same Low/Normal/High spread as monthly ones.
+    """
+    model = EcoAI()
+    for index, household in enumerate(households):
+        usage, events = household_readings(index, start, periods, frequency, seed, leak_rate, anomaly_rate)
+        codes = model.assess_usage_batch(usage * (DAYS_PER_MONTH if frequency == "daily" else 1.0))
+        columns = {"timestamp": _timestamps(start, periods, frequency).astype("datetime64[us]").astype(np.int64)}
+        columns.update((name, usage[:, i]) for i, name in enumerate(UTILITIES))
+        columns.update((f"{name.split('_')[0]}_status", codes[:, i]) for i, name in enumerate(UTILITIES))
+        columns["event"] = events
+        yield household, columns
+
+
+def misspell(name, rng):
+    """``name`` with one typo: a dropped, doubled, swapped or neighbouring-key letter."""
+    positions = [i for i, char in enumerate(name) if char.isalpha()]
+    if len(positions) < 2:
+        return name
+    i = positions[rng.integers(len(positions))]
+    edit = rng.integers(4)
+    if edit == 0:
+        return name[:i] + name[i + 1:]
+    if edit == 1:
+        return name[:i] + name[i] + name[i:]
+    if edit == 2 and i + 1 < len(name) and name[i + 1].isalpha():
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    neighbours = _NEIGHBOURS.get(name[i], "")
+    return name[:i] + neighbours[rng.integers(len(neighbours))] + name[i + 1:] if neighbours else name[:i] + name[i + 1:]
+
+
+def material_queries(count, seed=0, zipf=1.1, misspell_rate=0.1, catalog=None, chunk=4096):
+    """Yield ``(query, intended)`` pairs: catalog names drawn with Zipfian popularity, some misspelled."""
+    names = np.array(list(catalog or MATERIALS_DATABASE))
+    # Which names are popular is itself seeded, rather than following catalog order
+    names = names[np.random.default_rng([seed, 1]).permutation(len(names))]
+    weights = 1.0 / np.arange(1, len(names) + 1) ** zipf
+    weights /= weights.sum()
+    for number, offset in enumerate(range(0, count, chunk)):
+        rng = np.random.default_rng([seed, 2, number])
+        size = min(chunk, count - offset)
+        picks = names[rng.choice(len(names), size=size, p=weights)].tolist()
+        typos = (rng.random(size) < misspell_rate).tolist()
+        for intended, typo in zip(picks, typos):
+            yield (misspell(intended, rng) if typo else intended), intended
+
+
+def _format_of(path):
+    return "jsonl" if path.endswith((".jsonl", ".json")) else "csv"
+
+
+def write_readings(stream, path):
+    """Write ``readings()`` output to a CSV or JSONL file (by extension); returns the row count."""
+    fields = ["household", "timestamp", *UTILITIES, "event"]
+    rows = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f) if _format_of(path) == "csv" else None
+        if writer:
+            writer.writerow(fields)
+        for household, columns in stream:
+            timestamps = np.datetime_as_string(columns["timestamp"].astype("datetime64[us]"), unit="s").tolist()
+            events = np.array(EVENTS)[columns["event"]].tolist()
+            values = zip(timestamps, *(columns[name].tolist() for name in UTILITIES), events)
+            for row in values:
+                if writer:
+                    writer.writerow((household, *row))
+                else:
+                    f.write(json.dumps(dict(zip(fields, (household, *row)))) + "\n")
+            rows += len(timestamps)
+    return rows
+
+
+def write_queries(stream, path):
+    """Write ``material_queries()`` output to a CSV or JSONL file (by extension); returns the row count."""
+    rows = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f) if _format_of(path) == "csv" else None
+        if writer:
+            writer.writerow(["query", "intended"])
+        for query, intended in stream:
+            if writer:
+                writer.writerow((query, intended))
+            else:
+                f.write(json.dumps({"query": query, "intended": intended}) + "\n")
+            rows += 1
+    return rows
+
+
+def store_readings(stream):
+    """Save ``readings()`` output into each household's history; returns the row count."""
+    rows = 0
+    for household, columns in stream:
+        db.save_utility_batch({name: columns[name] for name in db.UTILITY_COLUMNS}, household)
+        rows += len(columns["timestamp"])
+    return rows
+
+
+def store_queries(stream):
+    """Replay searches as the Materials page does: names not yet in the database are saved with tips."""
+    rows = 0
+    for query, _ in stream:
+        query = query.lower()
+        if not db.find_material(query):
+            reuse, recycle = matcher.tips(query)
+            db.save_material(query, reuse, recycle)
+        rows += 1
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--households", type=int, default=1000)
+    parser.add_argument("--start", default="2022-01", help="first period, YYYY-MM or YYYY-MM-DD")
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--frequency", choices=["monthly", "daily"], default="monthly")
+    parser.add_argument("--leak-rate", type=float, default=0.05, help="share of households with a leak")
+    parser.add_argument("--anomaly-rate", type=float, default=0.01, help="chance of a spike or drop per reading")
+    parser.add_argument("--queries", type=int, default=0, help="number of material searches to generate")
+    parser.add_argument("--zipf", type=float, default=1.1, help="popularity skew of material searches")
+    parser.add_argument("--misspell-rate", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--readings", help="write readings to this .csv or .jsonl file")
+    parser.add_argument("--queries-out", help="write material searches to this .csv or .jsonl file")
+    parser.add_argument("--store", action="store_true", help="save into the store named by ECOAUDIT_DB")
+    args = parser.parse_args(argv)
+    if not (args.readings or args.queries_out or args.store):
+        parser.error("choose at least one of --readings, --queries-out or --store")
+
+    periods = round(args.years * (12 if args.frequency == "monthly" else 365.25))
+    households = household_ids(args.households)
+
+    def reading_stream():
+        return readings(households, args.start, periods, args.frequency, args.seed, args.leak_rate, args.anomaly_rate)
+
+    def query_stream():
+        return material_queries(args.queries, args.seed, args.zipf, args.misspell_rate)
+
+    if args.readings and households:
+        print(f"wrote {write_readings(reading_stream(), args.readings):,} readings to {args.readings}", file=sys.stderr)
+    if args.queries_out and args.queries:
+        print(f"wrote {write_queries(query_stream(), args.queries_out):,} searches to {args.queries_out}", file=sys.stderr)
+    if args.store:
+        saved = store_readings(reading_stream()) if households else 0
+        searched = store_queries(query_stream()) if args.queries else 0
+        db.store.flush()
+        print(f"saved {saved:,} readings and replayed {searched:,} searches into "
+              f"{os.environ.get('ECOAUDIT_DB', 'ecoaudit.db')}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()